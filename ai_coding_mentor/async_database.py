@@ -0,0 +1,187 @@
+import asyncio
+import os
+from typing import Optional, List, Union
+from bson import ObjectId
+from pymongo import AsyncMongoClient
+from pymongo.errors import BulkWriteError
+from models import Roadmap, Quiz, Resource
+from embedder import encode_async
+from indexes import ensure_indexes_async
+from vector_store import VectorBackend, VECTOR_BACKEND, atlas_pipeline, make_backend
+from database import (
+    MONGO_URI,
+    ITEM_PROJECTION,
+    NO_WRITES,
+    _query_embeddings,
+    _search_results,
+    get_client,
+    to_model,
+    in_order,
+    prepare_documents,
+    set_embeddings,
+    unresolved_slugs,
+    vector_entries,
+    search_results,
+    upsert_operations,
+    bulk_counts,
+)
+
+# Connections shared by concurrent tool calls
+MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+
+
+async def get_query_embedding(query: str) -> list:
+    """Embedding of a search query, reusing earlier embeddings of the same text."""
+    embedding = _query_embeddings.get(query)
+    if embedding is None:
+        embedding = (await encode_async([query]))[0].tolist()
+        _query_embeddings.set(query, embedding)
+    return embedding
+
+
+class AsyncDatabase:
+    """Asynchronous counterpart of Database for the Parlant tool server.
+
+    MongoDB calls go through a pooled AsyncMongoClient and embeddings are
+    computed on the embedder's executor, so concurrent tool calls don't
+    block the event loop or wait for each other. Documents are prepared,
+    converted and indexed with the same helpers as Database, and it shares
+    the query and search-result caches of the database module.
+    """
+
+    def __init__(self, client=None, vector_backend: Optional[VectorBackend] = None):
+        """
+        Args:
+            client: Async MongoDB client to use instead of connecting to MONGO_URI
+            vector_backend: Synchronous vector backend, run in a thread. Defaults
+                to the local backend (on the process's shared MongoClient) when
+                VECTOR_BACKEND is "local"; Atlas searches run as async aggregations.
+        """
+        self.client = client or AsyncMongoClient(MONGO_URI, maxPoolSize=MAX_POOL_SIZE)
+        self.db = self.client.ai_tutor_db
+        self.vectors = vector_backend
+        if self.vectors is None and VECTOR_BACKEND != "atlas":
+            self.vectors = make_backend(get_client().ai_tutor_db.resources)
+
+    async def ensure_indexes(self) -> None:
+        """Create the collections' indexes (see indexes.py); call once at startup"""
+        await ensure_indexes_async(self.db)
+
+    async def _bump_version(self, collection_name: str) -> None:
+        """Helper function to record a write, so cached reads of the collection expire."""
+        await self.db.versions.update_one({'_id': collection_name}, {'$inc': {'version': 1}}, upsert=True)
+
+    async def _written(self, collection_name: str, embedded: Optional[List[dict]] = None) -> None:
+        """Helper function to run after a write (see Database._written)."""
+        await self._bump_version(collection_name)
+        if collection_name == "resources":
+            if embedded and self.vectors is not None:
+                slugs = unresolved_slugs(embedded)
+                ids = {}
+                if slugs:
+                    async for doc in self.db.resources.find({"slug": {"$in": slugs}}, {"slug": 1}):
+                        ids[doc["slug"]] = doc["_id"]
+                await asyncio.to_thread(self.vectors.add, *vector_entries(embedded, ids))
+            _search_results.clear()
+
+    async def _get_by_id(self, collection_name: str, item_id: str, model_type: type) -> Optional[
+        Union[Roadmap, Quiz, Resource]]:
+        """Helper function to get an item by its ID from a specific collection."""
+        data = await self.db[collection_name].find_one({'_id': ObjectId(item_id)}, ITEM_PROJECTION)
+        return to_model(data, model_type) if data else None
+
+    async def _get_many(self, collection_name: str, item_ids: List[str], model_type: type) -> List[
+        Union[Roadmap, Quiz, Resource]]:
+        """Helper function to get items by ID, in the order of the IDs."""
+        data = self.db[collection_name].find(
+            {'_id': {'$in': [ObjectId(item_id) for item_id in item_ids]}},
+            ITEM_PROJECTION
+        )
+        return in_order([to_model(item, model_type) async for item in data], item_ids)
+
+    async def _create(self, collection_name: str, item: Union[Roadmap, Quiz, Resource]) -> str:
+        """Helper function to create a new item in a specific collection."""
+        documents, embedded, texts = prepare_documents([item])
+        set_embeddings(embedded, texts, await encode_async(texts))
+        result = await self.db[collection_name].insert_one(documents[0])
+        await self._written(collection_name, embedded)
+        return str(result.inserted_id)
+
+    async def _update(self, collection_name: str, item_id: str, item: Union[Roadmap, Quiz, Resource]) -> bool:
+        """Helper function to update an existing item in a specific collection."""
+        data = item.model_dump(exclude={"mongo_id"})
+        result = await self.db[collection_name].update_one(
+            {'_id': ObjectId(item_id)},
+            {'$set': data}
+        )
+        await self._written(collection_name)
+        return result.modified_count > 0
+
+    async def bulk_upsert(self, collection_name: str, items: List[Union[Roadmap, Quiz, Resource]]) -> dict:
+        """Write many items with a single unordered bulk_write (see Database.bulk_upsert)"""
+        documents, embedded, texts = prepare_documents(items)
+        if not documents:
+            return dict(NO_WRITES)
+        set_embeddings(embedded, texts, await encode_async(texts))
+
+        try:
+            counts = bulk_counts(
+                await self.db[collection_name].bulk_write(upsert_operations(documents), ordered=False)
+            )
+        except BulkWriteError as e:
+            counts = bulk_counts(e)
+        await self._written(collection_name, embedded)
+        return counts
+
+    async def create_roadmap(self, roadmap: Roadmap) -> str:
+        """Create a new roadmap"""
+        return await self._create("roadmaps", roadmap)
+
+    async def update_roadmap(self, roadmap_id: str, roadmap: Roadmap) -> bool:
+        """Update an existing roadmap"""
+        return await self._update("roadmaps", roadmap_id, roadmap)
+
+    async def get_roadmap(self, roadmap_id: str) -> Optional[Roadmap]:
+        """Get a roadmap by ID"""
+        return await self._get_by_id("roadmaps", roadmap_id, Roadmap)
+
+    async def create_quiz(self, quiz: Quiz) -> str:
+        """Create a new quiz"""
+        return await self._create("quizzes", quiz)
+
+    async def get_quiz(self, quiz_id: str) -> Optional[Quiz]:
+        """Get a quiz by ID"""
+        return await self._get_by_id("quizzes", quiz_id, Quiz)
+
+    async def create_resource(self, resource: Resource) -> str:
+        """Create a new resource"""
+        return await self._create("resources", resource)
+
+    async def get_resource(self, resource_id: str) -> Optional[Resource]:
+        """Get a resource by ID"""
+        return await self._get_by_id("resources", resource_id, Resource)
+
+    async def search_resources(self, query: str, limit: int = 2) -> list[Resource]:
+        """Search resources using vector similarity
+
+        Args:
+            query: The search query text
+            limit: Maximum number of results to return
+
+        Returns:
+            List of Resource objects sorted by relevance
+        """
+        cached_ids = _search_results.get((query, limit))
+        if cached_ids is not None:
+            return await self._get_many("resources", cached_ids, Resource)
+
+        query_embedding = await get_query_embedding(query)
+        if self.vectors is None:
+            cursor = await self.db.resources.aggregate(atlas_pipeline(query_embedding, limit))
+            results = await cursor.to_list()
+        else:
+            results = await asyncio.to_thread(self.vectors.search, query_embedding, limit)
+        return search_results(query, limit, results)
+
+    async def close(self) -> None:
+        await self.client.close()
@@ -0,0 +1,107 @@
+"""Cached data access for the Streamlit pages.
+
+Every widget interaction reruns the page script. The Database (and its
+MongoClient) is created once per server process and shared by all
+sessions, and list reads are cached across sessions. Cache entries are
+keyed by the collection's write counter (see Database.get_versions), so
+writes from any process, including the Parlant tool server, show up
+within VERSION_TTL seconds.
+"""
+import streamlit as st
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from database import Database
+from models import Roadmap, Quiz, Resource
+
+# How often the write counters are re-read
+VERSION_TTL = 2
+# Upper bound for cached reads, even without writes
+DATA_TTL = 10 * 60
+
+
+@st.cache_resource
+def get_database() -> Database:
+    """The Database shared by every session of this server"""
+    return Database()
+
+
+@st.cache_data(ttl=VERSION_TTL)
+def get_versions() -> dict:
+    return get_database().get_versions()
+
+
+def _version(collection_name: str) -> int:
+    return get_versions().get(collection_name, 0)
+
+
+def _written() -> None:
+    """Re-read the write counters on the next access after a write"""
+    get_versions.clear()
+
+
+@st.cache_data(ttl=DATA_TTL)
+def _roadmap_titles(version: int) -> List[dict]:
+    return get_database().get_roadmap_titles()
+
+
+@st.cache_data(ttl=DATA_TTL)
+def _roadmap(roadmap_id: str, version: int) -> Optional[Roadmap]:
+    return get_database().get_roadmap(roadmap_id)
+
+
+@st.cache_data(ttl=DATA_TTL)
+def _quiz_titles(version: int) -> List[dict]:
+    return get_database().get_quiz_titles()
+
+
+@st.cache_data(ttl=DATA_TTL)
+def _quiz(quiz_id: str, version: int) -> Optional[Quiz]:
+    return get_database().get_quiz(quiz_id)
+
+
+@st.cache_data(ttl=DATA_TTL)
+def _resources_page(after: Optional[tuple], version: int) -> Tuple[List[Resource], Optional[tuple]]:
+    # Cursors are passed as (created_at, id string) so Streamlit can hash them
+    cursor = {"created_at": after[0], "_id": ObjectId(after[1])} if after else None
+    items, cursor = get_database().get_resources_page(after=cursor)
+    return items, (cursor["created_at"], str(cursor["_id"])) if cursor else None
+
+
+def get_roadmap_titles() -> List[dict]:
+    return _roadmap_titles(_version("roadmaps"))
+
+
+def get_roadmap(roadmap_id: str) -> Optional[Roadmap]:
+    return _roadmap(roadmap_id, _version("roadmaps"))
+
+
+def get_quiz_titles() -> List[dict]:
+    return _quiz_titles(_version("quizzes"))
+
+
+def get_quiz(quiz_id: str) -> Optional[Quiz]:
+    return _quiz(quiz_id, _version("quizzes"))
+
+
+def get_resource_pages(pages: int) -> Tuple[List[Resource], bool]:
+    """Get the first ``pages`` pages of resources, and whether there are more"""
+    version = _version("resources")
+    resources, after = [], None
+    for _ in range(pages):
+        items, after = _resources_page(after, version)
+        resources.extend(items)
+        if after is None:
+            break
+    return resources, after is not None
+
+
+def update_roadmap(roadmap_id: str, roadmap: Roadmap) -> bool:
+    updated = get_database().update_roadmap(roadmap_id, roadmap)
+    _written()
+    return updated
+
+
+def update_progress(roadmap_id: str, progress: dict) -> bool:
+    updated = get_database().update_progress(roadmap_id, progress)
+    _written()
+    return updated
@@ -0,0 +1,255 @@
+"""Lazily loaded sentence embedder shared by the pages, tools and jobs.
+
+The model is only loaded on the first encode call, never at import. When an
+embedding worker is running (``python embedder.py``), encode calls from any
+process are sent to it over a local socket, so a single process holds the
+model in memory and concurrent requests are encoded together in batches.
+Without a worker the model is loaded in the calling process.
+
+Worker connections exchange pickled data, so they are authenticated with
+a secret key: EMBEDDER_AUTHKEY, or else a random key that the worker
+writes to EMBEDDER_KEY_FILE, readable only by its owner.
+"""
+import os
+import sys
+import secrets
+import queue
+import asyncio
+import threading
+import multiprocessing
+from pathlib import Path
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+from dotenv import load_dotenv
+import numpy as np
+
+load_dotenv()
+
+MODEL_NAME = os.getenv("EMBEDDING_MODEL", "BAAI/bge-large-en-v1.5")
+# Output size of MODEL_NAME; must be set along with EMBEDDING_MODEL, and
+# is checked when the model is loaded
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1024"))
+BATCH_SIZE = 64
+
+# "torch" (default) or "onnx". For int8 inference on CPU, point
+# EMBEDDING_ONNX_FILE at a quantized export (see `python embedder.py quantize`)
+BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE")
+
+WORKER_ADDRESS = (
+    os.getenv("EMBEDDER_HOST", "127.0.0.1"),
+    int(os.getenv("EMBEDDER_PORT", "6010")),
+)
+KEY_FILE = os.getenv("EMBEDDER_KEY_FILE", "runtime-data/embedder.key")
+# How long the worker waits for more requests to join a batch
+BATCH_WAIT = 0.005
+# Threads that run encode calls for async code, off the event loop
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "2"))
+
+_model = None
+_model_lock = threading.Lock()
+_local = threading.local()
+_executor = None
+
+
+def get_model():
+    """Load the SentenceTransformer model once per process."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+
+                kwargs = {"trust_remote_code": True}
+                if BACKEND == "onnx":
+                    kwargs["backend"] = "onnx"
+                    if ONNX_FILE:
+                        kwargs["model_kwargs"] = {"file_name": ONNX_FILE}
+                model = SentenceTransformer(MODEL_NAME, **kwargs)
+                dimensions = model.get_sentence_embedding_dimension()
+                if dimensions != EMBEDDING_DIMENSIONS:
+                    raise ValueError(
+                        f"{MODEL_NAME} produces {dimensions}-dimensional embeddings; "
+                        f"set EMBEDDING_DIMENSIONS={dimensions}"
+                    )
+                _model = model
+    return _model
+
+
+def get_authkey(create: bool = False) -> Optional[bytes]:
+    """Secret key of the worker connections.
+
+    Args:
+        create: Write a new random key to KEY_FILE if there is none (worker side)
+
+    Returns:
+        EMBEDDER_AUTHKEY or the contents of KEY_FILE, None if neither exists
+    """
+    key = os.getenv("EMBEDDER_AUTHKEY")
+    if key:
+        return key.encode()
+    path = Path(KEY_FILE)
+    if not path.exists():
+        if not create:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    return path.read_text().strip().encode()
+
+
+def encode_local(texts: list, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """Encode texts with the model loaded in this process."""
+    return get_model().encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+def _worker_connection():
+    """Return this thread's connection to the worker, or None if none is running."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        try:
+            authkey = get_authkey()
+        except OSError:
+            return None
+        if authkey is None:
+            return None
+        try:
+            conn = Client(WORKER_ADDRESS, authkey=authkey)
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            return None
+        _local.conn = conn
+    return conn
+
+
+def encode(texts: list, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """Encode texts, using the shared worker when one is running.
+
+    Returns:
+        Array of shape (len(texts), EMBEDDING_DIMENSIONS)
+    """
+    if not texts:
+        return np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+
+    conn = _worker_connection()
+    if conn is not None:
+        try:
+            conn.send(list(texts))
+            result = conn.recv()
+        except (OSError, EOFError):
+            # Worker went away; fall back to a local model
+            _local.conn = None
+        else:
+            if isinstance(result, Exception):
+                raise result
+            return result
+    return encode_local(list(texts), batch_size)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """The dedicated executor that runs encode calls for encode_async."""
+    global _executor
+    if _executor is None:
+        with _model_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(EMBEDDING_THREADS, thread_name_prefix="embedder")
+    return _executor
+
+
+async def encode_async(texts: list, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """Encode texts on the embedding executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), encode, list(texts), batch_size)
+
+
+class EmbeddingWorker:
+    """Serve encode requests from other processes with one shared model.
+
+    Requests that arrive while a batch is being encoded are queued and
+    merged into the next model call, up to ``batch_size`` texts.
+    """
+
+    def __init__(self, address=WORKER_ADDRESS, batch_size: int = BATCH_SIZE):
+        self.address = address
+        self.batch_size = batch_size
+        self.requests = queue.Queue()
+
+    def serve(self) -> None:
+        authkey = get_authkey(create=True)
+        get_model()
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        with Listener(self.address, backlog=64, authkey=authkey) as listener:
+            print(f"Embedding worker ({MODEL_NAME}, {BACKEND}) listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError, multiprocessing.AuthenticationError):
+                    # Failed handshake (e.g. wrong authkey); keep serving
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn) -> None:
+        """Answer requests on one client connection until it closes."""
+        with conn:
+            while True:
+                try:
+                    texts = conn.recv()
+                except (EOFError, OSError):
+                    return
+                done = threading.Event()
+                request = {"texts": texts, "done": done}
+                self.requests.put(request)
+                done.wait()
+                try:
+                    conn.send(request["result"])
+                except OSError:
+                    return
+
+    def _batch_loop(self) -> None:
+        while True:
+            batch = [self.requests.get()]
+            size = len(batch[0]["texts"])
+            while size < self.batch_size:
+                try:
+                    request = self.requests.get(timeout=BATCH_WAIT)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request["texts"])
+
+            texts = [text for request in batch for text in request["texts"]]
+            try:
+                vectors = encode_local(texts, self.batch_size)
+            except Exception as e:
+                # Every request in the batch gets the error back
+                vectors = e
+            start = 0
+            for request in batch:
+                stop = start + len(request["texts"])
+                request["result"] = (
+                    vectors if isinstance(vectors, Exception) else vectors[start:stop]
+                )
+                start = stop
+                request["done"].set()
+
+
+def quantize(output_dir: str, config: str = "avx512_vnni") -> None:
+    """Export an int8 dynamically quantized ONNX model for CPU inference."""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    model = SentenceTransformer(MODEL_NAME, backend="onnx", trust_remote_code=True)
+    model.save_pretrained(output_dir)
+    export_dynamic_quantized_onnx_model(model, config, output_dir)
+    print(f"Saved quantized model to {output_dir}/onnx/model_qint8_{config}.onnx")
+    print(
+        f"Use it with EMBEDDING_MODEL={output_dir} EMBEDDING_BACKEND=onnx "
+        f"EMBEDDING_ONNX_FILE=onnx/model_qint8_{config}.onnx"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "quantize":
+        quantize(*sys.argv[2:] or ["models/bge-large-int8"])
+    else:
+        EmbeddingWorker().serve()
@@ -0,0 +1,271 @@
+"""Bulk import of roadmaps, quizzes and resources from JSON files.
+
+Files use the formats in sample_schema/ or the fields of the models (as
+passed to the create_* tools). A file holds a single item, a list of
+items, or a catalog {"roadmaps": [...], "quizzes": [...], "resources": [...]}.
+The kind of an item is taken from --kind or its "kind" field, or else
+guessed from its fields.
+
+Files are parsed and validated in parallel worker processes, then each
+kind is written with one Database.bulk_upsert, which embeds all items in
+a single batch. Items are upserted by slug (their "slug" field, or else
+derived from the title or name), so re-importing a catalog updates it.
+
+Usage:
+    python importer.py PATH [PATH ...] [--kind roadmap|quiz|resource] [--workers N] [--dry-run]
+"""
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import unicodedata
+from itertools import repeat
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+from models import Roadmap, Quiz, Resource
+
+# Collection of each kind, also the keys of a catalog file
+COLLECTIONS = {
+    "roadmap": "roadmaps",
+    "quiz": "quizzes",
+    "resource": "resources",
+}
+# sample_schema resources have no type
+DEFAULT_RESOURCE_TYPE = "article"
+
+
+def slugify(text: str) -> str:
+    """Lowercase, dash-separated slug of a title or name.
+
+    Letters and digits of any script, "+" and "#" are kept, so "C++ Basics"
+    and "C Basics" get different slugs. When other characters have to be
+    dropped (e.g. "C++: Basics"), a short hash of the text is appended, so
+    titles that only differ in punctuation don't share a slug either.
+    """
+    text = unicodedata.normalize("NFKC", str(text)).strip().lower()
+    slug = re.sub(r"[^\w+#]+", "-", text).strip("-")
+    if slug != re.sub(r"[\s-]+", "-", text).strip("-"):
+        digest = hashlib.sha1(text.encode()).hexdigest()[:8]
+        slug = f"{slug}-{digest}" if slug else digest
+    return slug
+
+
+def _title(data: dict, kind: str) -> str:
+    if data.get("title"):
+        return data["title"]
+    if "id" in data:
+        return f"{kind.title()} {data['id']}"
+    raise ValueError(f"{kind} has no title or id")
+
+
+def _common(data: dict, name: str) -> dict:
+    """Fields shared by all kinds: slug and creation date."""
+    fields = {"slug": data.get("slug") or slugify(name)}
+    created_at = data.get("created_at") or data.get("createdAt") or data.get("updatedAt")
+    if created_at:
+        fields["created_at"] = created_at
+    return fields
+
+
+def parse_roadmap(data: dict) -> Roadmap:
+    """Roadmap from its model fields or the sample_schema/roadmap.json format"""
+    title = _title(data, "roadmap")
+    topics = []
+    for topic in data.get("topics", []):
+        # Some exports nest subtopics under "topics"
+        subtopics = topic.get("subtopics", topic.get("topics", []))
+        topics.append({
+            "name": topic["name"],
+            "subtopics": [
+                {"name": subtopic["name"], "completed": subtopic.get("completed", False)}
+                for subtopic in subtopics
+            ],
+            "completed": topic.get("completed", False),
+        })
+    return Roadmap.model_validate({
+        "title": title,
+        "description": data.get("description", ""),
+        "topics": topics,
+        **_common(data, title),
+    })
+
+
+def parse_quiz(data: dict) -> Quiz:
+    """Quiz from its model fields or the sample_schema/quiz.json format"""
+    title = _title(data, "quiz")
+    questions = []
+    for question in data.get("questions", []):
+        choices = question["choices"]
+        # sample_schema lists choices as strings plus the correct "answer"
+        if choices and isinstance(choices[0], str):
+            choices = [{"text": choice, "is_correct": choice == question.get("answer")} for choice in choices]
+        questions.append({
+            "question": question["question"],
+            "choices": choices,
+            "explanation": question.get("explanation", ""),
+        })
+    return Quiz.model_validate({
+        "title": title,
+        "description": data.get("description", ""),
+        "questions": questions,
+        **_common(data, title),
+    })
+
+
+def parse_resource(data: dict) -> Resource:
+    """Resource from its model fields or the sample_schema/resource.json format"""
+    return Resource.model_validate({
+        "name": data["name"],
+        "description": data.get("description", ""),
+        "asset": data.get("asset", ""),
+        "resource_type": data.get("resource_type") or DEFAULT_RESOURCE_TYPE,
+        **_common(data, data["name"]),
+    })
+
+
+PARSERS = {
+    "roadmap": parse_roadmap,
+    "quiz": parse_quiz,
+    "resource": parse_resource,
+}
+
+
+def detect_kind(data: dict) -> str:
+    """Guess whether an item is a roadmap, quiz or resource."""
+    if data.get("kind") in PARSERS:
+        return data["kind"]
+    if "questions" in data:
+        return "quiz"
+    if "topics" in data:
+        return "roadmap"
+    if "name" in data:
+        return "resource"
+    raise ValueError("can't tell whether this is a roadmap, quiz or resource")
+
+
+def parse_catalog(data: Union[dict, list], kind: Optional[str] = None) -> Tuple[
+    Dict[str, List[Union[Roadmap, Quiz, Resource]]], List[str]]:
+    """Parse and validate every item of a file or catalog
+
+    Args:
+        data: A single item, a list of items or a catalog dict
+        kind: Kind of every item, instead of detecting it
+
+    Returns:
+        (items by kind, error messages of the items that failed)
+    """
+    if isinstance(data, dict) and any(key in data for key in COLLECTIONS.values()):
+        entries = [(entry_kind, entry) for entry_kind, key in COLLECTIONS.items() for entry in data.get(key, [])]
+    else:
+        entries = [(kind, entry) for entry in (data if isinstance(data, list) else [data])]
+
+    items = {entry_kind: [] for entry_kind in PARSERS}
+    errors = []
+    for i, (entry_kind, entry) in enumerate(entries):
+        try:
+            entry_kind = entry_kind or detect_kind(entry)
+            items[entry_kind].append(PARSERS[entry_kind](entry))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            errors.append(f"item {i}: {type(e).__name__}: {e}")
+    return items, errors
+
+
+def load_file(path: Path, kind: Optional[str] = None) -> Tuple[Dict[str, list], List[str]]:
+    """Read and validate one JSON file (run in a worker process)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return {}, [f"{path}: {e}"]
+    items, errors = parse_catalog(data, kind)
+    return items, [f"{path}: {error}" for error in errors]
+
+
+def unique_by_slug(items: list) -> Tuple[list, List[str]]:
+    """Keep only the last of items sharing a slug, so one bulk write has no conflicts
+
+    Returns:
+        (unique items, slugs that were duplicated)
+    """
+    by_slug = {}
+    duplicates = []
+    for i, item in enumerate(items):
+        key = item.slug or i
+        if key in by_slug:
+            duplicates.append(item.slug)
+        by_slug[key] = item
+    return list(by_slug.values()), duplicates
+
+
+def collect_files(paths: List[str]) -> List[Path]:
+    """JSON files given directly or found in the given directories."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob("*.json")) if path.is_dir() else [path])
+    return files
+
+
+def import_items(db, items: Dict[str, list]) -> Dict[str, dict]:
+    """Bulk upsert parsed items (with unique slugs) into their collections
+
+    Returns:
+        Counts of inserted, updated and failed items per kind
+    """
+    counts = {}
+    for kind, models in items.items():
+        if models:
+            counts[kind] = db.bulk_upsert(COLLECTIONS[kind], models)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import roadmaps, quizzes and resources")
+    parser.add_argument("paths", nargs="+", help="JSON files or directories of JSON files")
+    parser.add_argument("--kind", choices=list(PARSERS), help="kind of every item (default: detect)")
+    parser.add_argument("--workers", type=int, default=None, help="validation processes (default: CPUs)")
+    parser.add_argument("--dry-run", action="store_true", help="only validate the files")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    started = time.monotonic()
+    items = {kind: [] for kind in PARSERS}
+    errors = []
+    with ProcessPoolExecutor(args.workers) as pool:
+        for file_items, file_errors in pool.map(load_file, files, repeat(args.kind), chunksize=16):
+            for kind, models in file_items.items():
+                items[kind].extend(models)
+            errors.extend(file_errors)
+
+    duplicates = 0
+    for kind, models in items.items():
+        items[kind], slugs = unique_by_slug(models)
+        duplicates += len(slugs)
+        for slug in slugs:
+            errors.append(f"{COLLECTIONS[kind]}: duplicate slug {slug!r}, only the last item is imported")
+
+    for error in errors:
+        print(error, file=sys.stderr)
+    print(
+        f"Validated {len(files)} files in {time.monotonic() - started:.1f}s: "
+        + ", ".join(f"{len(models)} {COLLECTIONS[kind]}" for kind, models in items.items())
+        + f", {duplicates} duplicates dropped, {len(errors) - duplicates} errors"
+    )
+    if args.dry_run:
+        return 1 if errors else 0
+
+    from database import Database
+
+    for kind, counts in import_items(Database(), items).items():
+        print(
+            f"  {COLLECTIONS[kind]}: {counts['inserted']} inserted, "
+            f"{counts['updated']} updated, {counts['failed']} failed"
+        )
+    print(f"Done in {time.monotonic() - started:.1f}s.")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
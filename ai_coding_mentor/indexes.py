@@ -0,0 +1,68 @@
+"""Secondary indexes of the MongoDB collections.
+
+INDEXES declares the indexes that the common queries rely on:
+
+* slug: get_quiz_by_slug, get_resource_by_slug and the importer's upserts.
+  Unique, so concurrent imports can't create two documents with one slug;
+  documents without a slug are left out of the index.
+* title: get_roadmap_by_title
+* created_at, _id: every listing sorted newest first (get_all, get_page, get_titles)
+
+ensure_indexes creates them once per process. create_indexes leaves
+existing identical indexes alone, so running it at every startup is cheap.
+"""
+import threading
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+SLUG_INDEX = IndexModel(
+    [("slug", ASCENDING)],
+    name="slug",
+    unique=True,
+    partialFilterExpression={"slug": {"$type": "string"}},
+)
+TITLE_INDEX = IndexModel([("title", ASCENDING)], name="title")
+# Same order as database.LIST_SORT, so sorted listings and pages walk the index
+CREATED_AT_INDEX = IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id")
+
+INDEXES = {
+    "roadmaps": [SLUG_INDEX, TITLE_INDEX, CREATED_AT_INDEX],
+    "quizzes": [SLUG_INDEX, CREATED_AT_INDEX],
+    "resources": [SLUG_INDEX, CREATED_AT_INDEX],
+}
+
+_ensured = set()
+_lock = threading.Lock()
+
+
+def _claim(db) -> bool:
+    """True for the first caller in this process for ``db``; later callers skip index creation."""
+    key = (id(db.client), db.name)
+    with _lock:
+        if key in _ensured:
+            return False
+        _ensured.add(key)
+        return True
+
+
+def ensure_indexes(db) -> None:
+    """Create the declared indexes in ``db`` if this process hasn't yet."""
+    if not _claim(db):
+        return
+    for collection_name, indexes in INDEXES.items():
+        try:
+            db[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            # e.g. an index on the same keys under another name, which queries still use
+            print(f"Could not create indexes on {collection_name}: {e}")
+
+
+async def ensure_indexes_async(db) -> None:
+    """ensure_indexes for an AsyncMongoClient database."""
+    if not _claim(db):
+        return
+    for collection_name, indexes in INDEXES.items():
+        try:
+            await db[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            print(f"Could not create indexes on {collection_name}: {e}")
@@ -34,6 +34,7 @@ class Topic(BaseModel):
 
 class Roadmap(BaseModel):
     title: str
+    slug: Optional[str] = None  # stable key for imports
     description: str = ""
     topics: List[Topic]
     created_at: datetime = Field(default_factory=datetime.now)
@@ -56,6 +57,7 @@ class QuizQuestion(BaseModel):
 
 class Quiz(BaseModel):
     title: str
+    slug: Optional[str] = None  # stable key for imports
     description: str = ""
     questions: List[QuizQuestion]
     created_at: datetime = Field(default_factory=datetime.now)
@@ -69,6 +71,7 @@ class Quiz(BaseModel):
 
 class Resource(BaseModel):
     name: str
+    slug: Optional[str] = None  # stable key for imports
     description: str
     asset: str = ""  # URL or file path
     resource_type: str  # video, article, code_example, etc.
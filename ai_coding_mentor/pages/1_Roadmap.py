@@ -1,11 +1,8 @@
 import streamlit as st
-from database import Database
 from models import Roadmap, Topic, SubTopic
 from datetime import datetime
 from components.chat import init_chat, show_chat
-
-# Initialize database
-db = Database()
+from components.data import get_roadmap_titles, get_roadmap, update_roadmap, update_progress
 
 
 def init_session_state():
@@ -21,29 +18,22 @@ def init_session_state():
     init_chat("w5HbpNTL14")
 
 
-def get_all_roadmaps():
-    """Get all available roadmaps"""
-    return db.get_all_roadmaps()
-
-
 def save_progress(roadmap: Roadmap):
-    """Save progress by updating the roadmap"""
+    """Save progress by updating only the subtopics whose checkbox changed"""
     try:
-        # Create a copy of the roadmap to avoid modifying the original
-        roadmap_data = roadmap.model_dump()
-        updated_roadmap = Roadmap.model_validate(roadmap_data)
-
-        # Update subtopic completion status from session state
-        for topic in updated_roadmap.topics:
+        progress = {}
+        for topic in roadmap.topics:
             for subtopic in topic.subtopics:
                 checkbox_key = f"checkbox_{subtopic.name}"
-                if checkbox_key in st.session_state.checkbox_states:
-                    subtopic.completed = st.session_state.checkbox_states[checkbox_key]
-            # Update topic completion based on subtopics
-            topic.completed = all(subtopic.completed for subtopic in topic.subtopics)
+                completed = st.session_state.checkbox_states.get(checkbox_key, subtopic.completed)
+                if completed != subtopic.completed:
+                    progress.setdefault(topic.name, {})[subtopic.name] = completed
 
-        # Save updated roadmap
-        return db.update_roadmap(str(roadmap.mongo_id), updated_roadmap)
+        # Nothing changed since the roadmap was loaded
+        if not progress:
+            return True
+
+        return update_progress(str(roadmap.mongo_id), progress)
     except Exception as e:
         st.error(f"Error saving progress: {str(e)}")
         return False
@@ -71,7 +61,7 @@ def create_topic_form(roadmap: Roadmap):
                 roadmap.topics.append(new_topic)
 
                 # Save roadmap
-                if db.update_roadmap(str(roadmap.mongo_id), roadmap):
+                if update_roadmap(str(roadmap.mongo_id), roadmap):
                     st.success("Topic created successfully!")
                     st.session_state.show_topic_creator = False
                     st.rerun()
@@ -102,7 +92,7 @@ def create_subtopic_form(roadmap: Roadmap, parent_topic: Topic):
                         break
 
                 # Save roadmap
-                if db.update_roadmap(str(roadmap.mongo_id), roadmap):
+                if update_roadmap(str(roadmap.mongo_id), roadmap):
                     st.success("Subtopic created successfully!")
                     st.session_state.show_subtopic_creator = None
                     st.rerun()
@@ -144,7 +134,7 @@ def show_roadmap():
     # Initialize session state
     init_session_state()
 
-    roadmaps = get_all_roadmaps()
+    roadmaps = get_roadmap_titles()
 
     if not roadmaps:
         st.warning("No roadmaps available. Please check your database connection.")
@@ -152,13 +142,19 @@ def show_roadmap():
 
     # If we have multiple roadmaps, let user select one
     if len(roadmaps) > 1:
-        selected_roadmap = st.selectbox(
+        selected = st.selectbox(
             "Select a Roadmap",
             roadmaps,
-            format_func=lambda x: x.title
+            format_func=lambda x: x["title"]
         )
     else:
-        selected_roadmap = roadmaps[0]
+        selected = roadmaps[0]
+
+    # Only the selected roadmap is loaded in full
+    selected_roadmap = get_roadmap(selected["mongo_id"])
+    if not selected_roadmap:
+        st.warning("The selected roadmap no longer exists.")
+        return
 
     # Display roadmap details
     st.header(selected_roadmap.title)
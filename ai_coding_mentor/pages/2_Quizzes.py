@@ -1,10 +1,7 @@
 import streamlit as st
-from database import Database
 from models import Quiz
 from components.chat import init_chat, show_chat
-
-# Initialize database
-db = Database()
+from components.data import get_roadmap_titles, get_roadmap, get_quiz_titles, get_quiz
 
 
 def init_session_state():
@@ -100,24 +97,23 @@ def show_roadmap_selector():
     """Show roadmap selection for quiz generation"""
     st.subheader("Generate Quiz from Roadmap")
 
-    # Get all roadmaps
-    roadmaps = db.get_all_roadmaps()
+    # Get roadmap titles; only the selected roadmap is loaded in full
+    roadmaps = get_roadmap_titles()
 
     if not roadmaps:
         st.warning("No roadmaps available. Create a roadmap first!")
         return
 
     # Create roadmap selection
-    roadmap_titles = [roadmap.title for roadmap in roadmaps]
-    selected_title = st.selectbox(
+    selected = st.selectbox(
         "Select a Roadmap to Generate Quiz From:",
-        roadmap_titles,
+        roadmaps,
+        format_func=lambda x: x["title"],
         key="roadmap_selector"
     )
 
-    if selected_title:
-        selected_roadmap = next(r for r in roadmaps if r.title == selected_title)
-        st.session_state.selected_roadmap = selected_roadmap
+    if selected:
+        st.session_state.selected_roadmap = get_roadmap(selected["mongo_id"])
 
 
 def show_quizzes():
@@ -134,22 +130,23 @@ def show_quizzes():
     ])
 
     with quiz_tab:
-        # Get all quizzes from database
-        quizzes = db.get_all_quizzes()
+        # Get quiz titles; only the selected quiz is loaded in full
+        quizzes = get_quiz_titles()
 
         if not quizzes:
             st.info("No quizzes available yet. Generate one from a roadmap!")
         else:
             # Quiz selection
-            quiz_titles = [quiz.title for quiz in quizzes]
-            selected_title = st.selectbox(
+            selected = st.selectbox(
                 "Select Quiz",
-                quiz_titles
+                quizzes,
+                format_func=lambda x: x["title"]
             )
 
-            if selected_title:
-                selected_quiz = next(q for q in quizzes if q.title == selected_title)
-                display_quiz(selected_quiz)
+            if selected:
+                selected_quiz = get_quiz(selected["mongo_id"])
+                if selected_quiz:
+                    display_quiz(selected_quiz)
 
     with generate_tab:
         # Show roadmap selector first
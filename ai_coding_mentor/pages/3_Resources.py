@@ -1,21 +1,27 @@
 import streamlit as st
-from database import Database
 from models import Resource
 from datetime import datetime
 from components.chat import init_chat, show_chat
-
-# Initialize database
-db = Database()
+from components.data import get_resource_pages
 
 
 def init_session_state():
+    # Number of pages of resources shown
+    if "resource_pages" not in st.session_state:
+        st.session_state.resource_pages = 1
+
     # Initialize chat with resources agent
     init_chat("QWODNTNOhX")
 
 
+def load_more_resources():
+    """Show the next page of resources"""
+    st.session_state.resource_pages += 1
+
+
 def display_resources():
-    """Display all resources"""
-    resources = db.get_all_resources()
+    """Display the resources loaded so far"""
+    resources, has_more = get_resource_pages(st.session_state.resource_pages)
 
     if not resources:
         st.info("No resources available yet. Add some using the form below!")
@@ -38,6 +44,9 @@ def display_resources():
                     st.write(f"Link: {resource.asset}")
                 st.caption(f"Added on: {resource.created_at.strftime('%Y-%m-%d')}")
 
+    if has_more:
+        st.button("Load more", on_click=load_more_resources)
+
 
 def main():
     st.title("Learning Resources")
@@ -5,7 +5,8 @@ from parlant.core.services.tools.plugins import PluginServer, tool
 from parlant.core.services.tools.service_registry import ServiceRegistry
 from parlant.core.tools import ToolContext, ToolResult
 
-from database import Database
+from async_database import AsyncDatabase
+from importer import COLLECTIONS, parse_catalog, unique_by_slug
 from models import (
     Roadmap, Quiz, Resource, QuizQuestion, QuizChoice,
     Topic, SubTopic
@@ -13,8 +14,8 @@ from models import (
 from datetime import datetime
 import json
 
-# Initialize database
-db = Database()
+# Initialize database (async, so tool calls don't block the event loop)
+db = AsyncDatabase()
 
 server_instance: PluginServer | None = None
 
@@ -66,7 +67,7 @@ async def create_roadmap(
         topics=topic_models,
         created_at=datetime.now()
     )
-    roadmap_id = db.create_roadmap(roadmap)
+    roadmap_id = await db.create_roadmap(roadmap)
     return ToolResult({"roadmap_id": roadmap_id})
 
 @tool
@@ -148,7 +149,7 @@ async def create_quiz(
         questions=question_models,
         created_at=datetime.now()
     )
-    quiz_id = db.create_quiz(quiz)
+    quiz_id = await db.create_quiz(quiz)
     return ToolResult({"quiz_id": quiz_id})
 
 
@@ -168,7 +169,7 @@ async def create_resource(
         resource_type=resource_type,
         created_at=datetime.now()
     )
-    resource_id = db.create_resource(resource)
+    resource_id = await db.create_resource(resource)
     return ToolResult({"resource_id": resource_id})
 
 @tool
@@ -187,7 +188,7 @@ async def search_resources(
         List of resources sorted by relevance to the query
     """
     try:
-        resources = db.search_resources(query, limit)
+        resources = await db.search_resources(query, limit)
         return ToolResult(
             {
             "message":f"Found {len(resources)} relevant resources",
@@ -199,17 +200,50 @@ async def search_resources(
             {"message": f"Failed to search resources: {str(e)}"}
         )
 
+@tool
+async def import_catalog(
+    context: ToolContext,
+    catalog_json: str  # JSON string containing roadmaps, quizzes and resources
+) -> ToolResult:
+    """Create or update many roadmaps, quizzes and resources at once
+
+    The catalog_json argument should be a JSON string with this structure, where
+    each item has the same fields as for create_roadmap, create_quiz and
+    create_resource, plus an optional "slug". An item whose slug (by default
+    derived from its title or name) already exists replaces the existing one:
+    {
+        "roadmaps": [{"title": "...", "description": "...", "topics": [...]}],
+        "quizzes": [{"title": "...", "description": "...", "questions": [...]}],
+        "resources": [{"name": "...", "description": "...", "asset": "...", "resource_type": "..."}]
+    }
+    """
+    try:
+        items, errors = parse_catalog(json.loads(catalog_json))
+    except ValueError as e:
+        return ToolResult({"message": f"Invalid catalog: {str(e)}"})
+
+    counts = {}
+    for kind, models in items.items():
+        models, duplicates = unique_by_slug(models)
+        errors += [f"{COLLECTIONS[kind]}: duplicate slug {slug!r}, only the last item was imported" for slug in duplicates]
+        if models:
+            counts[COLLECTIONS[kind]] = await db.bulk_upsert(COLLECTIONS[kind], models)
+    return ToolResult({"counts": counts, "errors": errors})
+
 TOOLS = [
     create_roadmap,
     create_quiz,
     create_resource,
     search_resources,
+    import_catalog,
 ]
 
 async def initialize_module(container: Container) -> None:
     global server_instance
     _background_task_service = container[BackgroundTaskService]
 
+    await db.ensure_indexes()
+
     server = PluginServer(
         tools=TOOLS,
         port=8094,
@@ -238,5 +272,7 @@ async def shutdown_module() -> None:
         await server_instance.shutdown()
         server_instance = None
 
+    await db.close()
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
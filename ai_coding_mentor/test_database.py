@@ -1,6 +1,8 @@
-from database import Database
+from database import Database, ITEM_PROJECTION, LIST_SORT
 from models import Roadmap, Topic, SubTopic, Quiz, QuizQuestion, QuizChoice, Resource
-from datetime import datetime
+from datetime import datetime, timedelta
+import time
+import mongomock
 
 def test_roadmap():
     print("\n=== Testing Roadmap Operations ===")
@@ -47,6 +49,9 @@ def test_roadmap():
         ]
     )
     
+    # Slugs are unique, so remove the roadmap of a previous run
+    db.db.roadmaps.delete_many({'slug': roadmap.slug})
+
     # Save roadmap
     roadmap_id = db.create_roadmap(roadmap)
     print(f"Created roadmap with ID: {roadmap_id}")
@@ -93,6 +98,9 @@ def test_quiz():
         ]
     )
     
+    # Slugs are unique, so remove the quiz of a previous run
+    db.db.quizzes.delete_many({'slug': quiz.slug})
+
     # Save quiz
     quiz_id = db.create_quiz(quiz)
     print(f"Created quiz with ID: {quiz_id}")
@@ -119,6 +127,9 @@ def test_resource():
         resource_type="video"
     )
     
+    # Slugs are unique, so remove the resource of a previous run
+    db.db.resources.delete_many({'slug': resource.slug})
+
     # Save resource
     resource_id = db.create_resource(resource)
     print(f"Created resource with ID: {resource_id}")
@@ -132,19 +143,115 @@ def test_resource():
     
     return resource_id
 
+# Not named test_*: it needs the roadmap created by test_roadmap, so main() runs it
+def check_user_progress(roadmap_id):
+    print("\n=== Testing Progress Updates ===")
+    db = Database()
+
+    # Complete the remaining subtopic of the first topic
+    changed = db.update_progress(roadmap_id, {
+        "Python Fundamentals": {"Variables and Data Types": True}
+    })
+    print(f"Roadmap found: {changed}")
+
+    roadmap = db.get_roadmap(roadmap_id)
+    for topic in roadmap.topics:
+        done = [subtopic.name for subtopic in topic.subtopics if subtopic.completed]
+        print(f"{topic.name}: completed={topic.completed}, subtopics done={done}")
+
+    assert roadmap.topics[0].completed, "Topic with all subtopics done should be completed"
+    assert not roadmap.topics[1].completed, "Topic with open subtopics should not be completed"
+
+def test_search_resources():
+    print("\n=== Testing Resource Search ===")
+    db = Database()
+
+    query = "Python variables tutorial"
+    start = time.perf_counter()
+    results = db.search_resources(query, limit=3)
+    first = time.perf_counter() - start
+    print(f"Found {len(results)} resources in {first * 1000:.1f} ms")
+    for resource in results:
+        print(f"- {resource.name}")
+
+    # Repeated lookups are served from the query and result caches
+    start = time.perf_counter()
+    db.search_resources(query, limit=3)
+    print(f"Repeated search took {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    return results
+
+def plan_stages(plan):
+    """All stage names in a query plan from explain()"""
+    if isinstance(plan, dict):
+        stages = [plan["stage"]] if "stage" in plan else []
+        for value in plan.values():
+            stages += plan_stages(value)
+        return stages
+    if isinstance(plan, list):
+        return [stage for value in plan for stage in plan_stages(value)]
+    return []
+
+def test_indexes():
+    print("\n=== Testing Query Plans ===")
+    db = Database()
+
+    # Lookups by slug and title and sorted listings should never scan a whole collection
+    queries = {
+        "get_quiz_by_slug": db.db.quizzes.find({"slug": "python-basics-quiz"}, ITEM_PROJECTION).limit(1),
+        "get_resource_by_slug": db.db.resources.find({"slug": "python-variables-tutorial"}, ITEM_PROJECTION).limit(1),
+        "get_roadmap_by_title": db.db.roadmaps.find({"title": "Python Beginner's Roadmap"}, ITEM_PROJECTION).limit(1),
+        "get_all_quizzes": db.db.quizzes.find({}, ITEM_PROJECTION).sort(LIST_SORT),
+        "get_roadmap_titles": db.db.roadmaps.find({}, {"title": 1}).sort(LIST_SORT),
+        "get_resources_page": db.db.resources.find({}, ITEM_PROJECTION).sort(LIST_SORT).limit(20),
+    }
+    for name, cursor in queries.items():
+        stages = plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+        print(f"{name}: {' <- '.join(stages)}")
+        assert "IXSCAN" in stages and "COLLSCAN" not in stages, f"{name} does not use an index"
+
+def test_page_without_created_at():
+    print("\n=== Testing Paging Without created_at ===")
+    # Offline: paging only needs queries that mongomock supports
+    db = Database(client=mongomock.MongoClient())
+    start = datetime(2024, 1, 1)
+    dated = [
+        {"slug": f"dated-{i}", "name": f"Dated {i}", "description": "", "resource_type": "article",
+         "created_at": start + timedelta(days=i)}
+        for i in range(5)
+    ]
+    undated = [
+        {"slug": "missing-date", "name": "Missing date", "description": "", "resource_type": "article"},
+        {"slug": "null-date", "name": "Null date", "description": "", "resource_type": "article", "created_at": None},
+        {"slug": "missing-date-2", "name": "Missing date 2", "description": "", "resource_type": "article"},
+    ]
+    db.db.resources.insert_many(dated + undated)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = db.get_resources_page(page_size=2, after=cursor)
+        seen += [resource.slug for resource in page]
+        if cursor is None:
+            break
+    print(f"Paged: {seen}")
+
+    # Newest first, then the undated documents, each exactly once
+    assert seen[:5] == [f"dated-{i}" for i in reversed(range(5))]
+    assert sorted(seen[5:]) == sorted(doc["slug"] for doc in undated)
+
 def main():
-    try:
-        print("Starting database tests...")
-        
-        # Test all operations
-        roadmap_id = test_roadmap()
-        quiz_id = test_quiz()
-        resource_id = test_resource()
-        test_user_progress("python-beginner-roadmap")
-        
-        print("\nAll tests completed successfully!")
-    except Exception as e:
-        print(f"\nError during testing: {str(e)}")
+    print("Starting database tests...")
+
+    # Test all operations; any failure propagates with its traceback
+    roadmap_id = test_roadmap()
+    quiz_id = test_quiz()
+    resource_id = test_resource()
+    test_search_resources()
+    check_user_progress(roadmap_id)
+    test_indexes()
+    test_page_without_created_at()
+
+    print("\nAll tests completed successfully!")
 
 if __name__ == "__main__":
     main()
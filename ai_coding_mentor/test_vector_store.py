@@ -0,0 +1,142 @@
+"""Offline tests of the local vector backend, against mongomock.
+
+Run with ``python test_vector_store.py`` or ``pytest test_vector_store.py``;
+no MongoDB server or embedding model is needed.
+"""
+import tempfile
+from pathlib import Path
+import numpy as np
+import mongomock
+from embedder import EMBEDDING_DIMENSIONS
+from vector_store import LocalVectorBackend
+
+
+def make_collection():
+    return mongomock.MongoClient().ai_tutor_db.resources
+
+
+def insert_resources(collection, count, seed=0):
+    """Insert resources with random embeddings; returns their ids and embeddings."""
+    vectors = np.random.default_rng(seed).normal(size=(count, EMBEDDING_DIMENSIONS)).astype(np.float32)
+    docs = [
+        {
+            "name": f"Resource {seed}-{i}",
+            "slug": f"resource-{seed}-{i}",
+            "description": "",
+            "resource_type": "article",
+            "embedding": vector.tolist(),
+            "embedding_hash": f"{seed}-{i}",
+        }
+        for i, vector in enumerate(vectors)
+    ]
+    ids = collection.insert_many(docs).inserted_ids
+    return ids, vectors
+
+
+def bump_version(collection):
+    """What Database does after every write to the collection."""
+    collection.database.versions.update_one({"_id": collection.name}, {"$inc": {"version": 1}}, upsert=True)
+
+
+def test_search_returns_nearest_first():
+    with tempfile.TemporaryDirectory() as tmp:
+        collection = make_collection()
+        ids, vectors = insert_resources(collection, 50)
+        backend = LocalVectorBackend(collection, Path(tmp) / "index.npz")
+
+        results = backend.search((vectors[7] + 0.01).tolist(), 3)
+        assert [doc["_id"] for doc in results][0] == ids[7]
+        assert results[0]["slug"] == "resource-0-7"
+        assert "embedding" not in results[0]
+        scores = [doc["score"] for doc in results]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_add_is_searchable_and_saved():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index.npz"
+        collection = make_collection()
+        insert_resources(collection, 20)
+        backend = LocalVectorBackend(collection, path)
+        backend.search(np.ones(EMBEDDING_DIMENSIONS).tolist(), 1)
+
+        new_ids, new_vectors = insert_resources(collection, 1, seed=1)
+        backend.add(new_ids, new_vectors, ["1-0"])
+        assert backend.search(new_vectors[0].tolist(), 1)[0]["_id"] == new_ids[0]
+
+        with np.load(path) as stored:
+            assert str(new_ids[0]) in set(stored["ids"])
+            assert stored["vectors"].shape == (21, EMBEDDING_DIMENSIONS)
+
+
+def test_reload_syncs_with_collection():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index.npz"
+        collection = make_collection()
+        ids, vectors = insert_resources(collection, 20)
+        LocalVectorBackend(collection, path).search(vectors[0].tolist(), 1)
+
+        # Changes made while no backend was running
+        collection.delete_one({"_id": ids[0]})
+        replacement = -vectors[1]
+        collection.update_one(
+            {"_id": ids[1]}, {"$set": {"embedding": replacement.tolist(), "embedding_hash": "changed"}}
+        )
+        new_ids, new_vectors = insert_resources(collection, 1, seed=2)
+
+        backend = LocalVectorBackend(collection, path)
+        assert backend.search(new_vectors[0].tolist(), 1)[0]["_id"] == new_ids[0]
+        assert backend.search(replacement.tolist(), 1)[0]["_id"] == ids[1]
+        assert str(ids[0]) not in backend.ids
+        assert len(backend.ids) == 20
+
+
+def test_sees_writes_from_other_processes():
+    with tempfile.TemporaryDirectory() as tmp:
+        collection = make_collection()
+        insert_resources(collection, 10)
+        backend = LocalVectorBackend(collection, Path(tmp) / "index.npz", check_interval=0)
+        backend.search(np.ones(EMBEDDING_DIMENSIONS).tolist(), 1)
+
+        # Another process inserts a resource and bumps the write counter
+        new_ids, new_vectors = insert_resources(collection, 1, seed=3)
+        bump_version(collection)
+        assert backend.search(new_vectors[0].tolist(), 1)[0]["_id"] == new_ids[0]
+
+
+def test_resources_without_hash_are_not_refetched():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index.npz"
+        collection = make_collection()
+        ids, vectors = insert_resources(collection, 5)
+        # Embedded before embedding_hash was stored
+        collection.update_many({}, {"$unset": {"embedding_hash": ""}})
+        LocalVectorBackend(collection, path).search(vectors[0].tolist(), 1)
+
+        backend = LocalVectorBackend(collection, path)
+        backend.search(vectors[0].tolist(), 1)
+        assert len(backend.ids) == 5
+        assert not backend._sync()
+
+        # Re-embedding sets a hash, which replaces the cached row
+        collection.update_one(
+            {"_id": ids[2]}, {"$set": {"embedding": (-vectors[2]).tolist(), "embedding_hash": "new"}}
+        )
+        assert backend._sync()
+        assert backend.search((-vectors[2]).tolist(), 1)[0]["_id"] == ids[2]
+
+
+def main():
+    for test in (
+        test_search_returns_nearest_first,
+        test_add_is_searchable_and_saved,
+        test_reload_syncs_with_collection,
+        test_sees_writes_from_other_processes,
+        test_resources_without_hash_are_not_refetched,
+    ):
+        test()
+        print(f"{test.__name__}: ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Vector search backends for resource embeddings.
+
+``atlas`` uses an Atlas ``$vectorSearch`` index. ``local`` keeps the
+embeddings in an in-process NumPy matrix, so semantic search also works
+against a local MongoDB (or mongomock) without a cloud cluster. Pick one
+with the VECTOR_BACKEND environment variable.
+"""
+import os
+import time
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List
+import numpy as np
+from dotenv import load_dotenv
+from bson import ObjectId
+from pymongo.operations import SearchIndexModel
+from embedder import EMBEDDING_DIMENSIONS
+
+load_dotenv()
+
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "atlas")
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "runtime-data/vector_index.npz")
+ATLAS_INDEX_NAME = "vector_index"
+
+# Fields returned for search results (never the embedding itself)
+SEARCH_PROJECTION = {
+    "name": 1,
+    "slug": 1,
+    "description": 1,
+    "asset": 1,
+    "resource_type": 1,
+    "created_at": 1,
+}
+SYNC_BATCH_SIZE = 1000
+# How often the local backend checks whether other processes changed resources
+SYNC_CHECK_INTERVAL = 2.0
+
+
+def atlas_pipeline(embedding: list, limit: int) -> list:
+    """Aggregation pipeline for an Atlas $vectorSearch over resource embeddings."""
+    return [
+        {
+            "$vectorSearch": {
+                "index": ATLAS_INDEX_NAME,
+                "queryVector": embedding,
+                "path": "embedding",
+                "numCandidates": limit * 10,  # Internal limit for pre-filtering
+                "limit": limit
+            }
+        },
+        {
+            "$project": {
+                **SEARCH_PROJECTION,
+                "score": {"$meta": "vectorSearchScore"}
+            }
+        }
+    ]
+
+
+class VectorBackend(ABC):
+    """Interface of a vector search backend over the resources collection."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    @abstractmethod
+    def search(self, embedding: list, limit: int) -> List[dict]:
+        """Return up to ``limit`` resource documents, most similar first, with a "score"."""
+
+    def add(self, ids: list, embeddings, hashes: list) -> None:
+        """Called after resources were inserted or re-embedded."""
+
+    def create_index(self) -> None:
+        """Build the search index from scratch."""
+
+
+class AtlasVectorBackend(VectorBackend):
+    """Search with the Atlas Vector Search index ``vector_index``."""
+
+    def search(self, embedding: list, limit: int) -> List[dict]:
+        return list(self.collection.aggregate(atlas_pipeline(embedding, limit)))
+
+    def create_index(self) -> None:
+        collection = self.collection
+
+        # List and drop all search indexes
+        try:
+            indexes = list(collection.list_search_indexes())
+            for index in indexes:
+
+                index_name = index.get("name")
+                if index_name:
+                    print(f"Dropping index: {index_name}")
+                    collection.drop_index(index_name)
+            print("Dropped all existing search indexes")
+        except Exception as e:
+            print(f"Error handling existing indexes: {e}")
+
+        # Create your index model, then create the search index
+        search_index_model = SearchIndexModel(
+            definition={
+                "mappings": {
+                    "dynamic": True,
+                    "fields": {
+                        "embedding": {
+                            "type": "knnVector",
+                            "dimensions": EMBEDDING_DIMENSIONS,
+                            "similarity": "cosine"
+                        }
+                    }
+                }
+            },
+            name=ATLAS_INDEX_NAME
+        )
+
+        # Wait a bit before creating new index
+        time.sleep(2)
+
+        result = collection.create_search_index(model=search_index_model)
+        print("New search index named " + result + " is building.")
+
+        # Wait for initial sync to complete
+        print("Polling to check if the index is ready. This may take up to a minute.")
+        predicate = lambda index: index.get("queryable") is True
+        while True:
+            indices = list(collection.list_search_indexes(name=ATLAS_INDEX_NAME))
+            if len(indices) and predicate(indices[0]):
+                break
+            time.sleep(1)  # Add small delay between checks
+
+        print(result + " is ready for querying.")
+
+
+class LocalVectorBackend(VectorBackend):
+    """Exact cosine search over an in-process matrix of unit-norm embeddings.
+
+    The matrix is persisted to ``path`` together with each resource's id and
+    embedding_hash. On first use the file is loaded and synced with the
+    collection: only resources that are new or were re-embedded since the
+    file was written are fetched. Inserts made through this process are
+    added to the matrix directly and saved. Writes from other processes are
+    picked up by re-syncing whenever the collection's write counter (see
+    Database.get_versions) or document count changes, checked at most every
+    ``check_interval`` seconds.
+    """
+
+    def __init__(self, collection, path: str = VECTOR_INDEX_PATH, check_interval: float = SYNC_CHECK_INTERVAL):
+        super().__init__(collection)
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.ids = []
+        self.hashes = []
+        self.vectors = np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+        self._positions = {}
+        self._loaded = False
+        self._state = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, EMBEDDING_DIMENSIONS)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _collection_state(self) -> tuple:
+        """Write counter and document count of the collection, to detect changes."""
+        version = self.collection.database.versions.find_one({"_id": self.collection.name})
+        return (version or {}).get("version"), self.collection.estimated_document_count()
+
+    def _ensure_loaded(self) -> None:
+        """Load the saved matrix on first use, and re-sync when the collection changed."""
+        now = time.monotonic()
+        if self._loaded and now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        state = self._collection_state()
+        if self._loaded and state == self._state:
+            return
+
+        if not self._loaded and self.path.exists():
+            with np.load(self.path) as stored:
+                self.ids = [str(i) for i in stored["ids"]]
+                self.hashes = [str(h) for h in stored["hashes"]]
+                self.vectors = stored["vectors"]
+            self._positions = {id_: i for i, id_ in enumerate(self.ids)}
+
+        changed = self._sync()
+        self._loaded = True
+        self._state = state
+        if changed:
+            self.save()
+
+    def _sync(self) -> bool:
+        """Drop rows of deleted or re-embedded resources and fetch missing ones."""
+        current = {
+            str(doc["_id"]): doc.get("embedding_hash", "")
+            for doc in self.collection.find(
+                {"embedding": {"$exists": True}}, {"embedding_hash": 1}
+            )
+        }
+        # Keep rows whose resource still has the same embedding. Resources
+        # embedded before hashes were stored have none; every write that
+        # changes an embedding also sets its hash, so a row without a hash
+        # stays valid until its resource gets one
+        keep = [i for i, (id_, h) in enumerate(zip(self.ids, self.hashes)) if current.get(id_) == h]
+        changed = len(keep) != len(self.ids)
+        if changed:
+            self.ids = [self.ids[i] for i in keep]
+            self.hashes = [self.hashes[i] for i in keep]
+            self.vectors = self.vectors[keep]
+            self._positions = {id_: i for i, id_ in enumerate(self.ids)}
+
+        missing = [id_ for id_ in current if id_ not in self._positions]
+        for start in range(0, len(missing), SYNC_BATCH_SIZE):
+            batch = [ObjectId(id_) for id_ in missing[start:start + SYNC_BATCH_SIZE]]
+            docs = list(self.collection.find(
+                {"_id": {"$in": batch}}, {"embedding": 1, "embedding_hash": 1}
+            ))
+            self._add(
+                [str(doc["_id"]) for doc in docs],
+                [doc["embedding"] for doc in docs],
+                [doc.get("embedding_hash", "") for doc in docs],
+            )
+            changed = True
+        return changed
+
+    def _add(self, ids: list, embeddings, hashes: list) -> None:
+        if not ids:
+            return
+        vectors = self._normalize(embeddings)
+        new_rows = []
+        for id_, h, vector in zip(ids, hashes, vectors):
+            position = self._positions.get(id_)
+            if position is None:
+                self._positions[id_] = len(self.ids)
+                new_rows.append(vector)
+                self.ids.append(id_)
+                self.hashes.append(h)
+            else:
+                self.vectors[position] = vector
+                self.hashes[position] = h
+        if new_rows:
+            self.vectors = np.vstack([self.vectors, np.stack(new_rows)])
+
+    def add(self, ids: list, embeddings, hashes: list) -> None:
+        with self._lock:
+            # Before the first load, the sync in _ensure_loaded picks them up
+            if self._loaded and len(ids):
+                self._add([str(i) for i in ids], embeddings, hashes)
+                self.save()
+
+    def save(self) -> None:
+        """Write the matrix, ids and hashes to ``path``."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Per-process temporary file, so concurrent writers don't clobber each other
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                ids=np.array(self.ids, dtype=str),
+                hashes=np.array(self.hashes, dtype=str),
+                vectors=self.vectors,
+            )
+        tmp.replace(self.path)
+
+    def search(self, embedding: list, limit: int) -> List[dict]:
+        with self._lock:
+            self._ensure_loaded()
+            ids, vectors = self.ids, self.vectors
+        if not ids:
+            return []
+
+        scores = vectors @ self._normalize(embedding)[0]
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        docs = {
+            str(doc["_id"]): doc
+            for doc in self.collection.find(
+                {"_id": {"$in": [ObjectId(ids[i]) for i in top]}}, SEARCH_PROJECTION
+            )
+        }
+        results = []
+        for i in top:
+            doc = docs.get(ids[i])
+            if doc is not None:
+                doc["score"] = float(scores[i])
+                results.append(doc)
+        return results
+
+    def create_index(self) -> None:
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.ids, self.hashes, self._positions = [], [], {}
+            self.vectors = self.vectors[:0]
+            self._loaded = False
+            self._state = None
+            self._ensure_loaded()
+        print(f"Local vector index with {len(self.ids)} resources saved to {self.path}")
+
+
+BACKENDS = {
+    "atlas": AtlasVectorBackend,
+    "local": LocalVectorBackend,
+}
+
+
+def make_backend(collection, name: str = VECTOR_BACKEND) -> VectorBackend:
+    """Create the vector backend called ``name`` for the resources collection."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown vector backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](collection)
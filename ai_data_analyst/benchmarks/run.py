@@ -0,0 +1,214 @@
+"""Benchmark suite for the loader, analyzer, visualizer and query context.
+
+Generates synthetic datasets at several scales and dtype mixes (including
+non-UTF-8 encodings and non-comma delimiters), times each operation and
+records wall time and peak traced memory to a JSON file.
+
+Usage:
+    python benchmarks/run.py [--scales small,medium] [--mixes numeric,mixed,text]
+                             [--output benchmarks/results.json]
+"""
+import sys
+import json
+import time
+import pickle
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.loader import DataLoader
+from src.analyzer import DataAnalyzer
+from src.visualizer import DataVisualizer
+from src.query import DataQuery
+from src.report import generate_report
+from src import context
+
+
+SCALES = {
+    "small": (1_000, 8),
+    "medium": (100_000, 20),
+    "large": (1_000_000, 20),
+}
+
+# (encoding, delimiter) used to write each dtype mix, so the loader's
+# encoding and delimiter detection is exercised too
+MIXES = {
+    "numeric": ("utf-8", ","),
+    "mixed": ("latin-1", ";"),
+    "text": ("cp1252", "\t"),
+}
+
+CITIES = ["Zürich", "São Paulo", "Montréal", "Kraków", "Boston", "Oslo"]
+
+
+def make_dataset(rows: int, cols: int, mix: str, seed: int = 0) -> pd.DataFrame:
+    """Build a synthetic DataFrame with the given shape and dtype mix."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(cols):
+        if mix == "numeric":
+            kind = "float" if i % 2 else "int"
+        elif mix == "mixed":
+            kind = ["int", "float", "category", "date"][i % 4]
+        else:
+            kind = ["category", "text", "float"][i % 3]
+
+        name = f"{kind}_{i}"
+        if kind == "int":
+            data[name] = rng.integers(0, 1_000, rows)
+        elif kind == "float":
+            values = rng.normal(100, 15, rows)
+            values[rng.random(rows) < 0.02] = np.nan
+            data[name] = values
+        elif kind == "category":
+            data[name] = rng.choice(CITIES, rows)
+        elif kind == "date":
+            start = np.datetime64("2020-01-01")
+            data[name] = (start + rng.integers(0, 1_500, rows)).astype(str)
+        else:
+            data[name] = [f"item-{v}" for v in rng.integers(0, rows, rows)]
+    return pd.DataFrame(data)
+
+
+def measure(func, *args, **kwargs) -> tuple:
+    """Run func and return (result, {"seconds", "peak_mb"})."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, {"seconds": round(elapsed, 4), "peak_mb": round(peak / 1024 / 1024, 2)}
+
+
+def bench_dataset(scale: str, mix: str, workdir: Path) -> dict:
+    rows, cols = SCALES[scale]
+    encoding, delimiter = MIXES[mix]
+    workdir.mkdir(parents=True)
+    frame = make_dataset(rows, cols, mix)
+    csv_path = workdir / f"{scale}_{mix}.csv"
+    frame.to_csv(csv_path, index=False, sep=delimiter, encoding=encoding)
+    del frame
+
+    timings = {}
+    loader = DataLoader(str(workdir / "cache"))
+    data, timings["load"] = measure(loader.load, str(csv_path))
+    _, timings["load_optimized"] = measure(
+        DataLoader(str(workdir / "cache")).load, str(csv_path), optimize=True
+    )
+    _, timings["write_parquet_cache"] = measure(loader.write_parquet_cache)
+
+    analyzer = DataAnalyzer(data)
+    _, timings["describe_all"] = measure(analyzer.describe_all)
+    _, timings["get_summary"] = measure(analyzer.get_summary)
+    _, timings["check_quality"] = measure(analyzer.check_quality)
+    _, timings["top_correlations"] = measure(analyzer.get_top_correlations)
+
+    viz = DataVisualizer(data, str(workdir / "outputs"))
+    numeric = list(data.select_dtypes(include=[np.number]).columns)
+    categorical = list(data.select_dtypes(include=["object", "category", "string"]).columns)
+    if numeric:
+        _, timings["histogram"] = measure(viz.histogram, numeric[0])
+        _, timings["box_plot"] = measure(viz.box_plot, numeric[0])
+    if len(numeric) >= 2:
+        _, timings["scatter_plot"] = measure(viz.scatter_plot, numeric[0], numeric[1])
+        _, timings["correlation_heatmap"] = measure(viz.correlation_heatmap)
+    if categorical:
+        _, timings["bar_chart"] = measure(viz.bar_chart, categorical[0])
+
+    report_dir = workdir / "report"
+    report_dir.mkdir()
+    _, timings["report_serial"] = measure(
+        generate_report, data, str(report_dir / "serial"), workers=1
+    )
+    _, timings["report_parallel"] = measure(
+        generate_report, data, str(report_dir / "parallel")
+    )
+    _, timings["report_unchanged"] = measure(
+        generate_report, data, str(report_dir / "parallel")
+    )
+
+    query = DataQuery(api_key="benchmark")
+    context._digest_cache.clear()
+    _, timings["build_context_cold"] = measure(query._build_context, data, "average")
+    _, timings["build_context_warm"] = measure(query._build_context, data, "average")
+
+    # State store: pickle of the whole DataFrame vs. the Parquet cache
+    pickle_path = workdir / "state.pkl"
+
+    def pickle_roundtrip():
+        with open(pickle_path, "wb") as f:
+            pickle.dump(data, f)
+        with open(pickle_path, "rb") as f:
+            return pickle.load(f)
+
+    parquet_path = workdir / "state.parquet"
+
+    def parquet_roundtrip():
+        data.to_parquet(parquet_path, index=False)
+        return pd.read_parquet(parquet_path)
+
+    _, timings["store_pickle"] = measure(pickle_roundtrip)
+    _, timings["store_parquet"] = measure(parquet_roundtrip)
+
+    return {
+        "scale": scale,
+        "mix": mix,
+        "rows": rows,
+        "columns": cols,
+        "encoding": encoding,
+        "delimiter": delimiter,
+        "timings": timings,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="small,medium")
+    parser.add_argument("--mixes", default=",".join(MIXES))
+    parser.add_argument("--output", default="benchmarks/results.json")
+    args = parser.parse_args()
+
+    scales = args.scales.split(",")
+    mixes = args.mixes.split(",")
+    for name in scales:
+        if name not in SCALES:
+            parser.error(f"unknown scale: {name}")
+    for name in mixes:
+        if name not in MIXES:
+            parser.error(f"unknown mix: {name}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            for mix in mixes:
+                print(f"Running {scale}/{mix}...", flush=True)
+                result = bench_dataset(scale, mix, Path(tmp) / f"{scale}_{mix}")
+                for op, t in result["timings"].items():
+                    print(f"  {op:<22} {t['seconds']:9.4f} s {t['peak_mb']:9.2f} MB")
+                results.append(result)
+
+    output = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.output).write_text(json.dumps(output, indent=2))
+    print(f"Saved: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
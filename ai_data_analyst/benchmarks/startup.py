@@ -0,0 +1,81 @@
+"""CLI startup benchmark and import regression guard.
+
+Runs light CLI commands with ``python -X importtime`` and fails if any of
+them imports a heavy library or takes longer than the time budget.
+
+Usage:
+    python benchmarks/startup.py [--max-ms 500] [--runs 5]
+
+"info" and "describe" are only checked when a dataset has been loaded in
+the current directory.
+"""
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "seaborn", "openai", "duckdb"]
+
+
+def command_lines() -> list:
+    commands = [["--help"]]
+    if Path(".ai_data_analyst.pkl").exists():
+        commands += [["info"], ["describe", "--column", "__missing__"]]
+    return commands
+
+
+def heavy_imports(args: list) -> list:
+    """Return the heavy top-level modules imported by a CLI command."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(MAIN), *args],
+        capture_output=True,
+        text=True,
+    )
+    found = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        module = line.rsplit("|", 1)[-1].strip().split(".")[0]
+        if module in HEAVY_MODULES:
+            found.add(module)
+    return sorted(found)
+
+
+def wall_time_ms(args: list, runs: int) -> float:
+    """Best-of-N wall time of a CLI command in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(MAIN), *args], capture_output=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-ms", type=float, default=500.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for command in command_lines():
+        name = " ".join(command)
+        heavy = heavy_imports(command)
+        elapsed = wall_time_ms(command, args.runs)
+        status = "ok"
+        if heavy:
+            status = f"FAIL imports {', '.join(heavy)}"
+            failed = True
+        elif elapsed > args.max_ms:
+            status = f"FAIL over {args.max_ms:.0f} ms"
+            failed = True
+        print(f"{name:<30} {elapsed:8.1f} ms  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
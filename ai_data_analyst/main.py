@@ -1,61 +1,159 @@
+import sys
 import click
 import json
 import pickle
 from pathlib import Path
-from src.loader import DataLoader
-from src.analyzer import DataAnalyzer
-from src.visualizer import DataVisualizer
-from src.query import DataQuery
+from src import server
+
+# Heavy libraries (pandas, matplotlib, openai) are imported inside the
+# commands that need them, so "info", "describe" and "--help" start fast.
 
 
 DATA_FILE = ".ai_data_analyst.pkl"
+META_FILE = ".ai_data_analyst_meta.json"
+CACHE_DIR = ".ai_data_analyst_cache"
+
 
+def save_state(loader, analyzer):
+    """Save current session state.
 
-def save_state(loader, analyzer, visualizer):
-    """Save current session state."""
+    Also writes dataset info and column statistics to a JSON metadata file,
+    which "info" and "describe" read without importing pandas.
+    """
     with open(DATA_FILE, "wb") as f:
-        pickle.dump(
-            {"loader": loader, "analyzer": analyzer, "visualizer": visualizer}, f
-        )
+        pickle.dump({"loader": loader, "analyzer": analyzer}, f)
+
+    meta = {"info": loader.get_info(), "columns": analyzer.describe_all()}
+    Path(META_FILE).write_text(json.dumps(meta, default=str))
+
+
+# Unpickled state keyed by the state file's mtime, so a long-running
+# server process only re-reads the file after a new "load"
+_state_cache = {}
 
 
 def load_state():
     """Load previous session state."""
-    if not Path(DATA_FILE).exists():
+    path = Path(DATA_FILE)
+    if not path.exists():
+        return None
+
+    mtime = path.stat().st_mtime_ns
+    if mtime not in _state_cache:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        _state_cache.clear()
+        _state_cache[mtime] = state
+    return _state_cache[mtime]
+
+
+_query = None
+
+
+def get_query():
+    """Return a DataQuery, created once per process."""
+    global _query
+    from src.query import DataQuery
+
+    if _query is None:
+        _query = DataQuery(cache_dir=CACHE_DIR)
+    return _query
+
+
+def load_meta():
+    """Load cached metadata, or None if there is no current metadata file."""
+    if not Path(DATA_FILE).exists() or not Path(META_FILE).exists():
         return None
-    with open(DATA_FILE, "rb") as f:
-        return pickle.load(f)
+    return json.loads(Path(META_FILE).read_text())
 
 
 @click.group()
-def cli():
+@click.pass_context
+def cli(ctx):
     """AI Data Analyst - Analyze data with natural language queries."""
-    pass
+    args = sys.argv[1:]
+    # Reading from stdin can't be forwarded to the server
+    if ctx.invoked_subcommand == "serve" or "-" in args:
+        return
+
+    try:
+        exit_code = server.forward(args)
+    except server.ServerError as e:
+        raise click.ClickException(str(e))
+    if exit_code is not None:
+        ctx.exit(exit_code)
+
+
+@cli.command()
+@click.option("--port", default=0, help="Port to listen on (default: any free port)")
+@click.option("--stop", is_flag=True, help="Stop the running server")
+def serve(port, stop):
+    """Run a local server that keeps the data and clients warm.
+
+    While it is running, other commands in this directory are executed by
+    the server instead of starting from scratch.
+    """
+    if stop:
+        try:
+            stopped = server.stop()
+        except server.ServerError as e:
+            raise click.ClickException(str(e))
+        click.echo("Server stopped." if stopped else "No server running.")
+        return
+
+    server.serve(cli, port)
 
 
 @cli.command()
 @click.argument("file_path")
-def load(file_path):
-    """Load a data file (CSV or Excel)."""
+@click.option(
+    "--optimize", is_flag=True, help="Convert columns to compact dtypes to save memory"
+)
+@click.option("--sheet", help="Excel sheet name or index (default: first sheet)")
+@click.option("--columns", help="Comma-separated Excel columns to read (default: all)")
+def load(file_path, optimize, sheet, columns):
+    """Load a data file (CSV, Excel or Parquet)."""
+    from src.loader import DataLoader
+    from src.analyzer import DataAnalyzer
+
     click.echo(f"Loading {file_path}...")
 
-    loader = DataLoader()
-    data = loader.load(file_path)
+    loader = DataLoader(CACHE_DIR)
+    try:
+        data = loader.load(
+            file_path,
+            cache=True,
+            optimize=optimize,
+            sheet=sheet,
+            columns=columns.split(",") if columns else None,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        click.echo(f"Error: {e}")
+        return
 
     analyzer = DataAnalyzer(data)
-    visualizer = DataVisualizer(data)
 
-    save_state(loader, analyzer, visualizer)
+    save_state(loader, analyzer)
 
     info = loader.get_info()
     click.echo(f"\nLoaded successfully!")
     click.echo(f"Rows: {info['rows']}, Columns: {info['columns']}")
     click.echo(f"Columns: {', '.join(info['column_names'])}")
+    if optimize:
+        click.echo(
+            f"Memory: {info['memory_before_optimization_mb']} MB -> "
+            f"{info['memory_usage_mb']} MB"
+        )
 
 
 @cli.command()
 def info():
     """Show information about loaded data."""
+    meta = load_meta()
+    if meta:
+        click.echo(json.dumps(meta["info"], indent=2))
+        return
+
     state = load_state()
     if not state:
         click.echo("No data loaded. Run 'load' first.")
@@ -86,6 +184,14 @@ def analyze():
 @click.option("--column", required=True, help="Column name")
 def describe(column):
     """Get statistics for a specific column."""
+    meta = load_meta()
+    if meta:
+        if column not in meta["columns"]:
+            click.echo(f"Error: Column not found: {column}")
+            return
+        click.echo(json.dumps(meta["columns"][column], indent=2))
+        return
+
     state = load_state()
     if not state:
         click.echo("No data loaded. Run 'load' first.")
@@ -95,24 +201,136 @@ def describe(column):
     click.echo(json.dumps(stats, indent=2))
 
 
+@cli.command()
+@click.option(
+    "--rules",
+    "rules_file",
+    type=click.File("r"),
+    help="JSON file with a list of rules (default: null-rate and outlier checks)",
+)
+def quality(rules_file):
+    """Run data-quality checks and print a report."""
+    state = load_state()
+    if not state:
+        click.echo("No data loaded. Run 'load' first.")
+        return
+
+    try:
+        rules = json.load(rules_file) if rules_file else None
+        report = state["analyzer"].check_quality(rules)
+        click.echo(json.dumps(report, indent=2, default=str))
+    except (ValueError, json.JSONDecodeError) as e:
+        click.echo(f"Error: {e}")
+
+
+@cli.command()
+@click.option(
+    "--method",
+    default="pearson",
+    show_default=True,
+    type=click.Choice(["pearson", "spearman"]),
+)
+@click.option("--top", default=10, show_default=True, help="Number of column pairs")
+def correlate(method, top):
+    """Show the most strongly correlated column pairs."""
+    state = load_state()
+    if not state:
+        click.echo("No data loaded. Run 'load' first.")
+        return
+
+    pairs = state["analyzer"].get_top_correlations(top, method)
+    click.echo(json.dumps(pairs, indent=2))
+
+
+@cli.command()
+@click.option("--time", "time_column", help="Time column (default: first datetime column)")
+@click.option("--freq", help="Resample period, e.g. h, D, W, MS")
+@click.option(
+    "--agg",
+    default="mean",
+    show_default=True,
+    type=click.Choice(["mean", "sum", "min", "max", "count", "median", "std", "first", "last"]),
+)
+@click.option("--columns", help="Comma-separated columns (default: all numeric)")
+@click.option("--rolling", "window", help="Rolling window: rows (e.g. 30) or time span (e.g. 7D)")
+@click.option("--gaps", is_flag=True, help="Report gaps between timestamps")
+@click.option("--min-gap", help="Smallest gap to report, e.g. 1h (default: 3x the usual interval)")
+@click.option("--limit", default=50, show_default=True, help="Maximum rows to print")
+def timeseries(time_column, freq, agg, columns, window, gaps, min_gap, limit):
+    """Resample, compute rolling statistics or find gaps over time."""
+    if not (freq or window or gaps):
+        click.echo("Provide --freq, --rolling or --gaps.")
+        return
+
+    state = load_state()
+    if not state:
+        click.echo("No data loaded. Run 'load' first.")
+        return
+
+    analyzer = state["analyzer"]
+    columns = columns.split(",") if columns else None
+    try:
+        if gaps:
+            report = analyzer.find_gaps(time_column, min_gap)
+            click.echo(json.dumps(report, indent=2))
+            return
+
+        if freq:
+            result = analyzer.resample(freq, time_column, columns, agg)
+        if window:
+            window = int(window) if window.isdigit() else window
+            if freq:
+                # Rolling statistics over the resampled periods
+                result = result.rolling(window, min_periods=1).mean()
+            elif not columns or len(columns) != 1:
+                click.echo("Error: --rolling without --freq needs a single --columns value")
+                return
+            else:
+                result = analyzer.rolling(columns[0], window, time_column)
+
+        click.echo(result.head(limit).to_string())
+        if len(result) > limit:
+            click.echo(f"... {len(result) - limit} more rows")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+
+
 @cli.command()
 @click.option(
     "--type",
     "plot_type",
-    required=True,
-    type=click.Choice(["histogram", "bar", "box", "scatter", "correlation"]),
+    type=click.Choice(["histogram", "bar", "box", "scatter", "correlation", "timeseries"]),
 )
-@click.option("--column", help="Column name (for histogram, bar, box)")
-@click.option("--x", help="X column (for scatter)")
+@click.option("--column", help="Column name (for histogram, bar, box, timeseries)")
+@click.option("--x", help="X column (for scatter; time column for timeseries)")
 @click.option("--y", help="Y column (for scatter)")
-def plot(plot_type, column, x, y):
+@click.option("--all", "all_plots", is_flag=True, help="Render a full report of plots")
+@click.option("--workers", type=int, help="Worker processes for --all")
+@click.option("--force", is_flag=True, help="Re-render unchanged plots (with --all)")
+def plot(plot_type, column, x, y, all_plots, workers, force):
     """Generate a visualization."""
+    if not plot_type and not all_plots:
+        click.echo("Provide --type or --all.")
+        return
+
+    from src.visualizer import DataVisualizer
+
     state = load_state()
     if not state:
         click.echo("No data loaded. Run 'load' first.")
         return
 
-    viz = state["visualizer"]
+    viz = DataVisualizer(state["loader"].data)
+
+    if all_plots:
+        from src.report import generate_report
+
+        results = generate_report(
+            viz.data, str(viz.output_dir), workers=workers, force=force
+        )
+        for result in results:
+            click.echo(f"{result['status']}: {result['path']}")
+        return
 
     try:
         if plot_type == "histogram":
@@ -125,6 +343,8 @@ def plot(plot_type, column, x, y):
             path = viz.scatter_plot(x, y)
         elif plot_type == "correlation":
             path = viz.correlation_heatmap()
+        elif plot_type == "timeseries":
+            path = viz.timeseries_plot(column, time_column=x)
 
         click.echo(f"Saved: {path}")
     except Exception as e:
@@ -132,18 +352,234 @@ def plot(plot_type, column, x, y):
 
 
 @cli.command()
-@click.argument("question")
-def query(question):
+@click.argument("query")
+def sql(query):
+    """Run a SQL query against the loaded data (table name: data)."""
+    state = load_state()
+    if not state:
+        click.echo("No data loaded. Run 'load' first.")
+        return
+
+    try:
+        result = state["loader"].sql(query)
+        click.echo(result.to_string(index=False))
+    except Exception as e:
+        click.echo(f"Error: {e}")
+
+
+@cli.group()
+def workspace():
+    """Manage named datasets for joins and multi-dataset questions."""
+    pass
+
+
+@workspace.command("add")
+@click.argument("name")
+@click.argument("file_path")
+@click.option("--optimize", is_flag=True, help="Convert columns to compact dtypes")
+def workspace_add(name, file_path, optimize):
+    """Add a data file to the workspace as NAME."""
+    from src.workspace import Workspace
+
+    try:
+        entry = Workspace().add(name, file_path, optimize=optimize)
+        click.echo(f"Added {name}: {entry['rows']} rows, {len(entry['columns'])} columns")
+    except (ValueError, FileNotFoundError) as e:
+        click.echo(f"Error: {e}")
+
+
+@workspace.command("list")
+def workspace_list():
+    """List the datasets in the workspace."""
+    from src.workspace import Workspace
+
+    ws = Workspace()
+    if not ws.names():
+        click.echo("Workspace is empty. Run 'workspace add' first.")
+        return
+    for name, entry in ws.manifest.items():
+        click.echo(f"{name}: {entry['rows']} rows, columns: {', '.join(entry['columns'])}")
+
+
+@workspace.command("join")
+@click.argument("left")
+@click.argument("right")
+@click.option("--on", "on", required=True, multiple=True, help="Key column (repeatable)")
+@click.option(
+    "--how",
+    default="inner",
+    show_default=True,
+    type=click.Choice(["inner", "left", "right", "outer"]),
+)
+@click.option("--name", required=True, help="Name for the joined dataset")
+@click.option("--force", is_flag=True, help="Recompute even if the result is cached")
+def workspace_join(left, right, on, how, name, force):
+    """Join LEFT and RIGHT on key columns into a new dataset."""
+    from src.workspace import Workspace
+
+    try:
+        entry = Workspace().join(left, right, list(on), name, how=how, force=force)
+        click.echo(f"Created {name}: {entry['rows']} rows, {len(entry['columns'])} columns")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+
+
+@workspace.command("concat")
+@click.argument("names", nargs=-1, required=True)
+@click.option("--name", required=True, help="Name for the combined dataset")
+@click.option("--force", is_flag=True, help="Recompute even if the result is cached")
+def workspace_concat(names, name, force):
+    """Stack datasets with matching column names into a new dataset."""
+    from src.workspace import Workspace
+
+    try:
+        entry = Workspace().concat(list(names), name, force=force)
+        click.echo(f"Created {name}: {entry['rows']} rows, {len(entry['columns'])} columns")
+    except Exception as e:
+        click.echo(f"Error: {e}")
+
+
+@workspace.command("sql")
+@click.argument("query")
+def workspace_sql(query):
+    """Run a SQL query over workspace datasets (one table per name)."""
+    from src.workspace import Workspace
+
+    try:
+        result = Workspace().sql(query)
+        click.echo(result.to_string(index=False))
+    except Exception as e:
+        click.echo(f"Error: {e}")
+
+
+@workspace.command("use")
+@click.argument("name")
+@click.pass_context
+def workspace_use(ctx, name):
+    """Make a workspace dataset the loaded data for the other commands."""
+    from src.workspace import Workspace
+
+    ws = Workspace()
+    if name not in ws.manifest:
+        click.echo(f"Error: Dataset not found: {name}")
+        return
+    ctx.invoke(
+        load,
+        file_path=str(ws.root / f"{name}.parquet"),
+        optimize=False,
+        sheet=None,
+        columns=None,
+    )
+
+
+@workspace.command("drop")
+@click.argument("name")
+def workspace_drop(name):
+    """Remove a dataset from the workspace."""
+    from src.workspace import Workspace
+
+    try:
+        Workspace().drop(name)
+        click.echo(f"Dropped {name}")
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+
+
+def read_questions(lines) -> list:
+    """Parse batch questions from plain-text or JSONL lines.
+
+    Plain lines are taken as the question text. JSONL lines must have a
+    "question" key and may have an "id"; otherwise the line number is used.
+
+    Raises:
+        ValueError: A JSONL line is invalid or has no "question"
+    """
+    questions = []
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {number}: invalid JSON: {e}") from e
+            if not isinstance(item.get("question"), str):
+                raise ValueError(f'line {number}: JSONL lines need a "question" string')
+            questions.append({"id": item.get("id", number), "question": item["question"]})
+        else:
+            questions.append({"id": number, "question": line})
+    return questions
+
+
+async def run_batch(q, questions, data, exact, concurrency):
+    """Answer questions concurrently and stream results out as JSONL."""
+    async for result in q.ask_batch(questions, data, exact=exact, concurrency=concurrency):
+        click.echo(json.dumps(result))
+
+
+@cli.command()
+@click.argument("question", required=False)
+@click.option(
+    "--exact",
+    is_flag=True,
+    help="Compute the answer locally from an LLM query plan instead of a data sample",
+)
+@click.option(
+    "--file",
+    "questions_file",
+    type=click.File("r"),
+    help="Answer questions from a text or JSONL file ('-' for stdin), one per line",
+)
+@click.option(
+    "--concurrency", default=8, show_default=True, help="Parallel requests in batch mode"
+)
+@click.option(
+    "--dataset",
+    "datasets",
+    multiple=True,
+    help="Ask about workspace datasets instead of the loaded data (repeatable). "
+    "Takes a single QUESTION, without --exact or --file",
+)
+def query(question, exact, questions_file, concurrency, datasets):
     """Ask a question about the data in natural language."""
+    if datasets and (exact or questions_file):
+        raise click.UsageError("--dataset can't be combined with --exact or --file.")
+    if not question and not questions_file:
+        click.echo("Provide a QUESTION or --file.")
+        return
+
+    if datasets:
+        from src.workspace import Workspace
+
+        try:
+            click.echo(get_query().ask_workspace(question, Workspace(), list(datasets)))
+        except ValueError as e:
+            click.echo(f"Error: {e}")
+        except Exception as e:
+            click.echo(f"API Error: {e}")
+        return
+
+    import asyncio
+
     state = load_state()
     if not state:
         click.echo("No data loaded. Run 'load' first.")
         return
 
     try:
-        q = DataQuery()
-        answer = q.ask(question, state["loader"].data)
-        click.echo(answer)
+        q = get_query()
+        if questions_file:
+            questions = read_questions(questions_file)
+            asyncio.run(
+                run_batch(q, questions, state["loader"].data, exact, concurrency)
+            )
+        elif exact:
+            answer = q.ask_exact(question, state["loader"].data)
+            click.echo(answer)
+        else:
+            answer = q.ask(question, state["loader"].data)
+            click.echo(answer)
     except ValueError as e:
         click.echo(f"Error: {e}")
     except Exception as e:
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from typing import Optional
+from src import correlation, timeseries
+from src.quality import QualityChecker, count_duplicates
 
 
 class DataAnalyzer:
@@ -37,7 +39,11 @@ class DataAnalyzer:
                 }
             )
 
-        if col.dtype == "object" or pd.api.types.is_categorical_dtype(col):
+        if (
+            col.dtype == "object"
+            or isinstance(col.dtype, pd.CategoricalDtype)
+            or pd.api.types.is_string_dtype(col)
+        ):
             value_counts = col.value_counts().head(10)
             result["top_values"] = {str(k): int(v) for k, v in value_counts.items()}
 
@@ -53,30 +59,66 @@ class DataAnalyzer:
                 stats[col] = {"error": str(e)}
         return stats
 
-    def get_correlation(self) -> Optional[pd.DataFrame]:
-        """Get correlation matrix for numeric columns."""
-        numeric_cols = self.data.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) < 2:
-            return None
-        return self.data[numeric_cols].corr()
+    def get_correlation(self, method: str = "pearson") -> Optional[pd.DataFrame]:
+        """Get correlation matrix for numeric columns (pearson or spearman)."""
+        return correlation.correlation_matrix(self.data, method)
+
+    def get_top_correlations(self, k: int = 10, method: str = "pearson") -> list:
+        """Get the k most strongly correlated column pairs."""
+        pairs = correlation.top_pairs(self.data, k, method)
+        return [
+            {"column_a": a, "column_b": b, "correlation": round(float(r), 4)}
+            for a, b, r in pairs.itertuples(index=False)
+        ]
 
     def get_data_types(self) -> dict:
         """Categorize columns by data type."""
         return {
             "numeric": list(self.data.select_dtypes(include=[np.number]).columns),
             "categorical": list(
-                self.data.select_dtypes(include=["object", "category"]).columns
+                self.data.select_dtypes(include=["object", "category", "string"]).columns
             ),
             "datetime": list(self.data.select_dtypes(include=["datetime64"]).columns),
             "boolean": list(self.data.select_dtypes(include=["bool"]).columns),
         }
 
+    def resample(
+        self,
+        freq: str,
+        time_column: Optional[str] = None,
+        columns: Optional[list] = None,
+        agg: str = "mean",
+    ) -> pd.DataFrame:
+        """Aggregate columns per time period (defaults to the first datetime column)."""
+        time_column = timeseries.time_column(self.data, time_column)
+        return timeseries.resample(self.data, time_column, freq, columns, agg)
+
+    def rolling(
+        self,
+        column: str,
+        window,
+        time_column: Optional[str] = None,
+        stats: Optional[list] = None,
+    ) -> pd.DataFrame:
+        """Rolling statistics of a column over a row count or time span (e.g. "7D")."""
+        time_column = timeseries.time_column(self.data, time_column)
+        return timeseries.rolling(self.data, time_column, column, window, stats)
+
+    def find_gaps(self, time_column: Optional[str] = None, min_gap: Optional[str] = None) -> dict:
+        """Find missing stretches between consecutive timestamps."""
+        time_column = timeseries.time_column(self.data, time_column)
+        return timeseries.find_gaps(self.data, time_column, min_gap)
+
+    def check_quality(self, rules: Optional[list] = None) -> dict:
+        """Run data-quality rules (see QualityChecker) and return the report."""
+        return QualityChecker(self.data).run(rules)
+
     def get_summary(self) -> dict:
         """Get a quick summary of the dataset."""
         return {
             "rows": len(self.data),
             "columns": len(self.data.columns),
             "missing_values": int(self.data.isnull().sum().sum()),
-            "duplicate_rows": int(self.data.duplicated().sum()),
+            "duplicate_rows": count_duplicates(self.data),
             "dtypes": self.get_data_types(),
         }
@@ -0,0 +1,187 @@
+import json
+import re
+import hashlib
+import weakref
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+
+
+CHARS_PER_TOKEN = 4
+SAMPLE_VALUES = 3
+SAMPLE_MAX_CHARS = 40
+
+_digest_cache: dict = {}
+# id(frame) -> (weak reference to the frame, its fingerprint)
+_fingerprints: dict = {}
+
+
+def remember_fingerprint(data: pd.DataFrame, key: str) -> None:
+    """Use ``key`` as the fingerprint of this frame object from now on."""
+    frame_id = id(data)
+
+    def forget(ref):
+        if _fingerprints.get(frame_id, (None,))[0] is ref:
+            del _fingerprints[frame_id]
+
+    _fingerprints[frame_id] = (weakref.ref(data, forget), key)
+
+
+def fingerprint(data: pd.DataFrame) -> str:
+    """Dataset fingerprint from the shape, schema and every row.
+
+    All rows are hashed, so an edit anywhere in the frame gives a new
+    fingerprint and the digest, correlation and time series caches keyed on
+    it don't serve stale results. Hashing a large frame takes seconds, so
+    it is done once per frame object and remembered; frames are not
+    modified in place after loading. DataLoader remembers a key built from
+    the source file instead, so loaded data is never hashed at all.
+    """
+    entry = _fingerprints.get(id(data))
+    if entry is not None and entry[0]() is data:
+        return entry[1]
+
+    h = hashlib.sha1()
+    h.update(repr(data.shape).encode())
+    h.update(repr([(str(c), str(t)) for c, t in data.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(data).to_numpy().tobytes())
+    key = h.hexdigest()
+    remember_fingerprint(data, key)
+    return key
+
+
+def _words(text: str) -> set:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+class SchemaDigest:
+    """Compact per-column summary of a dataset used as LLM context."""
+
+    def __init__(self, rows: int, columns: list):
+        self.rows = rows
+        self.columns = columns
+
+    @classmethod
+    def from_data(cls, data: pd.DataFrame) -> "SchemaDigest":
+        """Summarize every column in a single pass over the data."""
+        rows = len(data)
+        columns = []
+        for name, col in data.items():
+            nulls = int(col.isnull().sum())
+            entry = {
+                "name": str(name),
+                "dtype": str(col.dtype),
+                "null_rate": round(nulls / rows, 4) if rows else 0.0,
+            }
+
+            values = col.dropna()
+            if pd.api.types.is_bool_dtype(col):
+                entry["samples"] = [str(v) for v in values.unique()[:SAMPLE_VALUES]]
+            elif pd.api.types.is_numeric_dtype(col) and len(values):
+                entry["min"] = float(values.min())
+                entry["max"] = float(values.max())
+                entry["mean"] = round(float(values.mean()), 4)
+            elif pd.api.types.is_datetime64_any_dtype(col) and len(values):
+                entry["min"] = str(values.min())
+                entry["max"] = str(values.max())
+            else:
+                entry["unique"] = int(values.nunique())
+                top = values.value_counts().head(SAMPLE_VALUES)
+                entry["samples"] = [str(v)[:SAMPLE_MAX_CHARS] for v in top.index]
+
+            columns.append(entry)
+
+        return cls(rows, columns)
+
+    def to_dict(self) -> dict:
+        return {"rows": self.rows, "columns": self.columns}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SchemaDigest":
+        return cls(data["rows"], data["columns"])
+
+    @staticmethod
+    def _format_number(value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else f"{value:.4g}"
+
+    def _column_line(self, entry: dict) -> str:
+        parts = [entry["dtype"], f"{entry['null_rate']:.0%} null"]
+        if "mean" in entry:
+            parts.append(
+                f"range {self._format_number(entry['min'])}"
+                f"..{self._format_number(entry['max'])}, "
+                f"mean {self._format_number(entry['mean'])}"
+            )
+        elif "min" in entry:
+            parts.append(f"range {entry['min']}..{entry['max']}")
+        if "unique" in entry:
+            parts.append(f"{entry['unique']} unique")
+        if entry.get("samples"):
+            parts.append("e.g. " + ", ".join(entry["samples"]))
+        return f"  - {entry['name']}: " + ", ".join(parts)
+
+    def _relevance(self, entry: dict, question_words: set) -> int:
+        """Score a column by how strongly the question refers to it."""
+        score = 0
+        if _words(entry["name"]) & question_words:
+            score += 2
+        if any(_words(s) & question_words for s in entry.get("samples", [])):
+            score += 1
+        return score
+
+    def render(self, question: str = "", max_tokens: int = 1000) -> str:
+        """Render the digest, listing question-relevant columns first.
+
+        Columns are added until the approximate token budget is used up; the
+        remaining column names are listed without details if they fit.
+        """
+        question_words = _words(question)
+        order = sorted(
+            range(len(self.columns)),
+            key=lambda i: -self._relevance(self.columns[i], question_words),
+        )
+
+        budget = max_tokens * CHARS_PER_TOKEN
+        lines = [f"Shape: {self.rows} rows, {len(self.columns)} columns\n", "Columns:"]
+        used = sum(len(line) + 1 for line in lines)
+
+        omitted = []
+        for i in order:
+            line = self._column_line(self.columns[i])
+            if used + len(line) + 1 > budget:
+                omitted.append(self.columns[i]["name"])
+                continue
+            lines.append(line)
+            used += len(line) + 1
+
+        if omitted:
+            names = f"Other columns: {', '.join(omitted)}"
+            if used + len(names) <= budget:
+                lines.append(names)
+            else:
+                lines.append(f"({len(omitted)} more columns omitted)")
+
+        return "\n".join(lines)
+
+
+def get_digest(data: pd.DataFrame, cache_dir: Optional[str] = None) -> SchemaDigest:
+    """Return the schema digest for a dataset, computing it at most once.
+
+    Digests are cached in memory by fingerprint and, when ``cache_dir`` is
+    given, also stored on disk so later processes can reuse them.
+    """
+    key = fingerprint(data)
+    if key in _digest_cache:
+        return _digest_cache[key]
+
+    path = Path(cache_dir) / f"digest_{key}.json" if cache_dir else None
+    if path is not None and path.exists():
+        digest = SchemaDigest.from_dict(json.loads(path.read_text()))
+    else:
+        digest = SchemaDigest.from_data(data)
+        if path is not None:
+            path.parent.mkdir(exist_ok=True)
+            path.write_text(json.dumps(digest.to_dict()))
+
+    _digest_cache[key] = digest
+    return digest
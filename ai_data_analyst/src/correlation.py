@@ -0,0 +1,337 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+from src.context import fingerprint
+
+
+METHODS = {"pearson", "spearman"}
+BLOCK_SIZE = 256
+# Values per array when re-ranking Spearman pairs, which bounds their memory
+RERANK_CHUNK_VALUES = 2_000_000
+
+# Standardized matrices and results for the most recently seen dataset
+_cache = {"key": None, "prepared": {}, "matrices": {}}
+
+
+def _session(data: pd.DataFrame) -> dict:
+    """Return the cache for this dataset, dropping caches of other datasets."""
+    key = fingerprint(data)
+    if _cache["key"] != key:
+        _cache.update(key=key, prepared={}, matrices={})
+    return _cache
+
+
+def numeric_columns(data: pd.DataFrame) -> list:
+    return list(data.select_dtypes(include=[np.number]).columns)
+
+
+def _prepare(data: pd.DataFrame, method: str) -> tuple:
+    """Center and scale the numeric columns once per dataset and method.
+
+    Spearman correlation is Pearson correlation of the ranks, so for
+    ``spearman`` each column is replaced by its (average) ranks first.
+
+    Returns:
+        (columns, Z, mask, ranking) where Z holds unit-norm centered columns
+        with missing values set to 0, mask marks present values (None when
+        nothing is missing), and ranking is the _ranking of the columns, which
+        pairs with different missing rows are re-ranked from (only for
+        ``spearman`` with missing values, else None)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported correlation method: {method}")
+
+    session = _session(data)
+    if method in session["prepared"]:
+        return session["prepared"][method]
+
+    columns = numeric_columns(data)
+    x = data[columns].to_numpy(dtype=np.float64)
+    ranking = None
+    if method == "spearman":
+        if np.isnan(x).any():
+            ranking = _ranking(x)
+        x = data[columns].rank().to_numpy(dtype=np.float64)
+
+    present = ~np.isnan(x)
+    mask = None if present.all() else present.astype(np.float64)
+
+    x = x - np.nanmean(x, axis=0)
+    x[~present] = 0.0
+    if mask is None:
+        norms = np.sqrt((x * x).sum(axis=0))
+        norms[norms == 0] = np.nan
+        x /= norms
+
+    session["prepared"][method] = (columns, x, mask, ranking)
+    return session["prepared"][method]
+
+
+def _ranking(x: np.ndarray) -> tuple:
+    """Sort order and tie groups of every column, for _pairwise_spearman.
+
+    Arrays are column x row, so each column is contiguous.
+
+    Returns:
+        (present, order, position, starts, ends, tied) where order sorts
+        each column (missing values last), position is its inverse, starts
+        and ends mark the first and last sorted position of each group of
+        tied values, and tied flags the columns that have ties
+    """
+    x = np.ascontiguousarray(x.T)
+    present = ~np.isnan(x)
+    order = np.argsort(x, axis=1, kind="stable")
+    position = np.empty_like(order)
+    np.put_along_axis(position, order, np.arange(x.shape[1])[None, :], axis=1)
+    ordered = np.take_along_axis(x, order, axis=1)
+    starts = np.ones_like(present)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    ends = np.ones_like(present)
+    ends[:, :-1] = starts[:, 1:]
+    tied = ~(starts | ~np.take_along_axis(present, order, axis=1)).all(axis=1)
+    return present, order, position, starts, ends, tied
+
+
+def _average_ranks(
+    included: np.ndarray, starts: np.ndarray, ends: np.ndarray, tied: bool
+) -> np.ndarray:
+    """Average ranks among the ``included`` sorted positions of each row.
+
+    Ranks only count included positions, and tied values (a group between
+    a start and an end) share the mean of their ranks. Without ties, the
+    rank is just the running count.
+    """
+    upto = np.cumsum(included, axis=1, dtype=np.int32)
+    if not tied:
+        return upto.astype(np.float64)
+    before = upto - included
+    n = included.shape[1]
+    # Carry the counts at each tie group's start forward and at its end back
+    less = np.maximum.accumulate(np.where(starts, before, 0), axis=1)
+    through = np.minimum.accumulate(np.where(ends, upto, n)[:, ::-1], axis=1)[:, ::-1]
+    return less + (through - less + 1) * 0.5
+
+
+def _pairwise_spearman(ranking: tuple, rows: np.ndarray, j: int) -> np.ndarray:
+    """Spearman correlation of columns ``rows`` with column ``j`` over the
+    rows both have, ranking each pair's values among those rows only.
+
+    Every column is compared in its own sorted order, so the ranks come
+    from running counts instead of sorting each pair.
+    """
+    present, order, position, starts, ends, tied = ranking
+    order_i = order[rows]
+    # Sorted positions of each column whose row also has column j; missing
+    # values sort last, so they are the positions past the column's count
+    counts = present[rows].sum(axis=1)
+    valid = np.arange(order.shape[1])[None, :] < counts[:, None]
+    both = present[j][order_i] & valid
+    ranks_i = _average_ranks(both, starts[rows], ends[rows], tied[rows].any())
+
+    # Column j's ranks over each column's rows, computed in j's sorted order
+    # and then rearranged into each column's sorted order
+    in_j_order = present[rows][:, order[j]]
+    ranks_j = _average_ranks(in_j_order, starts[j][None, :], ends[j][None, :], tied[j])
+    ranks_j = np.take_along_axis(ranks_j, position[j][order_i], axis=1)
+
+    ranks_i[~both] = 0.0
+    ranks_j[~both] = 0.0
+    n = both.sum(axis=1)
+    # Average ranks of n values always have mean (n + 1) / 2
+    shift = n * ((n + 1) / 2) ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = np.einsum("ij,ij->i", ranks_i, ranks_j) - shift
+        var = (np.einsum("ij,ij->i", ranks_i, ranks_i) - shift) * (
+            np.einsum("ij,ij->i", ranks_j, ranks_j) - shift
+        )
+        return np.clip(cov / np.sqrt(var), -1.0, 1.0)
+
+
+def _block(
+    z: np.ndarray,
+    mask: Optional[np.ndarray],
+    cols: slice,
+    ranking: Optional[tuple] = None,
+    upper: bool = False,
+) -> np.ndarray:
+    """Correlations of every column with the columns in ``cols``.
+
+    Without missing values this is a single matrix product of unit-norm
+    columns. With missing values, pairwise-complete correlations are built
+    from per-pair counts and sums, each also a matrix product.
+
+    Ranks computed per column only match the ranks over a pair's complete
+    rows when both columns miss the same rows, so with ``ranking`` (Spearman)
+    the pairs missing different rows are re-ranked over their complete rows
+    (see _pairwise_spearman), as ``DataFrame.corr(method="spearman")`` does.
+    Each such pair is re-ranked once and mirrored when both of its columns
+    are in ``cols``. With ``upper``, only pairs whose row comes before their
+    column are re-ranked, for callers that drop the rest.
+    """
+    if mask is None:
+        return z.T @ z[:, cols]
+
+    m, mb = mask, mask[:, cols]
+    zb = z[:, cols]
+    n = m.T @ mb
+    sx = z.T @ mb
+    sy = m.T @ zb
+    sxx = (z * z).T @ mb
+    syy = m.T @ (zb * zb)
+    sxy = z.T @ zb
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        r = cov / np.sqrt(var)
+    r[n < 2] = np.nan
+    r = np.clip(r, -1.0, 1.0)
+
+    if ranking is not None:
+        counts = mask.sum(axis=0)
+        differ = ((n != counts[:, None]) | (n != counts[cols][None, :])) & (n >= 2)
+        col_index = np.arange(mask.shape[1])[cols]
+        # Block column of each column in the block, -1 for the others
+        in_block = np.full(mask.shape[1], -1)
+        in_block[col_index] = np.arange(len(col_index))
+        chunk = max(1, RERANK_CHUNK_VALUES // mask.shape[0])
+        mirrored = []
+        for b, j in enumerate(col_index):
+            rows = np.nonzero(differ[:, b])[0]
+            if upper:
+                rows = rows[rows < j]
+            else:
+                # Pairs with a later column of the block are computed from its side
+                later = (rows > j) & (in_block[rows] >= 0)
+                mirrored.extend((i, b) for i in rows[later])
+                rows = rows[~later]
+            for start in range(0, len(rows), chunk):
+                part = rows[start:start + chunk]
+                r[part, b] = _pairwise_spearman(ranking, part, j)
+        for i, b in mirrored:
+            r[i, b] = r[col_index[b], in_block[i]]
+    return r
+
+
+def _with_diagonal(r: np.ndarray) -> np.ndarray:
+    """Set the diagonal to 1, except for columns without variance (NaN)."""
+    np.fill_diagonal(r, np.where(np.isnan(np.diag(r)), np.nan, 1.0))
+    return r
+
+
+def correlation_matrix(data: pd.DataFrame, method: str = "pearson") -> Optional[pd.DataFrame]:
+    """Full correlation matrix of the numeric columns, cached per dataset.
+
+    Returns None when there are fewer than two numeric columns.
+    """
+    session = _session(data)
+    if method in session["matrices"]:
+        return session["matrices"][method]
+
+    columns, z, mask, ranking = _prepare(data, method)
+    if len(columns) < 2:
+        return None
+
+    r = _with_diagonal(_block(z, mask, slice(None), ranking))
+    result = pd.DataFrame(r, index=columns, columns=columns)
+    session["matrices"][method] = result
+    return result
+
+
+def top_pairs(
+    data: pd.DataFrame,
+    k: int = 10,
+    method: str = "pearson",
+    block_size: int = BLOCK_SIZE,
+) -> pd.DataFrame:
+    """The ``k`` column pairs with the largest absolute correlation.
+
+    The matrix is computed ``block_size`` columns at a time and only the
+    best candidates of each block are kept, so memory stays at
+    O(columns * block_size) rather than O(columns^2).
+    """
+    columns, z, mask, ranking = _prepare(data, method)
+    n_cols = len(columns)
+
+    best_i = np.empty(0, dtype=np.int64)
+    best_j = np.empty(0, dtype=np.int64)
+    best_r = np.empty(0)
+    for start in range(0, n_cols, block_size):
+        stop = min(start + block_size, n_cols)
+        r = _block(z, mask, slice(start, stop), ranking, upper=True)
+
+        # Keep each pair once: row index i < column index j
+        i, j = np.nonzero(np.arange(n_cols)[:, None] < np.arange(start, stop)[None, :])
+        values = r[i, j]
+        keep = ~np.isnan(values)
+        i, j, values = i[keep], j[keep] + start, values[keep]
+
+        best_i = np.concatenate([best_i, i])
+        best_j = np.concatenate([best_j, j])
+        best_r = np.concatenate([best_r, values])
+        if len(best_r) > k:
+            top = np.argpartition(-np.abs(best_r), k - 1)[:k]
+            best_i, best_j, best_r = best_i[top], best_j[top], best_r[top]
+
+    order = np.argsort(-np.abs(best_r))
+    return pd.DataFrame(
+        {
+            "column_a": [columns[i] for i in best_i[order]],
+            "column_b": [columns[j] for j in best_j[order]],
+            "correlation": best_r[order],
+        }
+    )
+
+
+def clustered_columns(data: pd.DataFrame, k: int, method: str = "pearson") -> list:
+    """Pick up to ``k`` strongly correlated columns, ordered so similar ones are adjacent.
+
+    Columns are taken from the top correlated pairs, then ordered as a
+    greedy nearest-neighbour chain on |r|: starting from the most connected
+    column, the next one is always the unplaced column most correlated with
+    the last one, which keeps clusters together.
+    """
+    columns = numeric_columns(data)
+    if len(columns) <= k:
+        chosen = columns
+    else:
+        chosen = []
+        pairs = top_pairs(data, k=k * k, method=method)
+        for a, b in zip(pairs["column_a"], pairs["column_b"]):
+            for col in (a, b):
+                if col not in chosen and len(chosen) < k:
+                    chosen.append(col)
+        for col in columns:
+            if len(chosen) >= k:
+                break
+            if col not in chosen:
+                chosen.append(col)
+
+    block = block_matrix(data, chosen, method)
+    weights = np.nan_to_num(np.abs(block.to_numpy()))
+    np.fill_diagonal(weights, -1.0)
+
+    order = [int(np.argmax(weights.sum(axis=1)))]
+    placed = np.zeros(len(chosen), dtype=bool)
+    placed[order[0]] = True
+    while len(order) < len(chosen):
+        candidates = np.where(placed, -np.inf, weights[order[-1]])
+        order.append(int(np.argmax(candidates)))
+        placed[order[-1]] = True
+    return [chosen[i] for i in order]
+
+
+def block_matrix(data: pd.DataFrame, columns: list, method: str = "pearson") -> pd.DataFrame:
+    """Correlation matrix restricted to ``columns``."""
+    session = _session(data)
+    full = session["matrices"].get(method)
+    if full is not None:
+        return full.loc[columns, columns]
+
+    all_columns, z, mask, ranking = _prepare(data, method)
+    idx = [all_columns.index(c) for c in columns]
+    zs = z[:, idx]
+    ms = None if mask is None else mask[:, idx]
+    rs = None if ranking is None else tuple(a[idx] for a in ranking)
+    r = _with_diagonal(_block(zs, ms, slice(None), rs))
+    return pd.DataFrame(r, index=columns, columns=columns)
@@ -1,20 +1,97 @@
+import re
+import csv
+import codecs
+import warnings
+import shutil
+import hashlib
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Optional
+from src.context import remember_fingerprint
+
+
+CACHE_DIR = ".ai_data_analyst_cache"
+TABLE_NAME = "data"
+CATEGORY_MAX_RATIO = 0.5
+# Dates like 2024-01-31, 2024/01/31, 31/01/2024 or 2024-01-31T12:00; pure
+# digit strings such as "2020" are codes, not dates
+DATE_PATTERN = re.compile(
+    r"^(\d{4}[-/]\d{1,2}([-/]\d{1,2})?|\d{1,2}[-/]\d{1,2}[-/]\d{4})([ T]\d.*)?$"
+)
+# Share of sampled values that must look like and parse as dates
+DATE_MIN_RATIO = 0.9
+DATE_SAMPLE_ROWS = 1000
+EXCEL_CHUNK_ROWS = 50_000
+CSV_SNIFF_BYTES = 64 * 1024
+# latin-1 decodes any bytes, so it goes last
+CSV_ENCODINGS = ["utf-8", "cp1252", "latin-1"]
+CSV_DELIMITERS = ",;\t|"
+
+
+def _sql_string(path: Path) -> str:
+    """Quote a file path as a SQL string literal."""
+    return "'" + str(path).replace("'", "''") + "'"
+
+
+def header_names(header: tuple) -> list:
+    """Column names from a header row, made unique the way pandas does.
+
+    Blank cells become "Unnamed: <position>", and repeated names get a
+    ".1", ".2", ... suffix, so a sheet with two "id" columns loads as
+    "id" and "id.1", as with pd.read_excel.
+    """
+    names = []
+    counts = {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None or value == "" else str(value)
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        names.append(name)
+        counts[name] = count + 1
+    return names
+
+
+def cache_file(cache_dir: Path, path: Path, suffix: str = ".parquet") -> Path:
+    """Cache file for a source file, keyed on its resolved path.
+
+    Files with the same name in different directories get different cache
+    files, e.g. a/sales.csv and b/sales.xlsx.
+    """
+    digest = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:12]
+    return cache_dir / f"{path.stem}-{digest}{suffix}"
 
 
 class DataLoader:
     """Handles loading data from various file formats."""
 
-    def __init__(self):
+    def __init__(self, cache_dir: str = CACHE_DIR):
         self.data: Optional[pd.DataFrame] = None
         self.file_path: Optional[Path] = None
+        self.cache_dir = Path(cache_dir)
+        self.parquet_path: Optional[Path] = None
+        self.memory_before_mb: Optional[float] = None
+        self.fingerprint: Optional[str] = None
 
-    def load(self, file_path: str) -> pd.DataFrame:
-        """Load data from CSV or Excel file.
+    def load(
+        self,
+        file_path: str,
+        cache: bool = False,
+        optimize: bool = False,
+        sheet: Optional[str] = None,
+        columns: Optional[list] = None,
+    ) -> pd.DataFrame:
+        """Load data from CSV, Excel or Parquet file.
 
         Args:
             file_path: Path to the data file
+            cache: Also write the data to a Parquet cache for the SQL engine
+            optimize: Convert columns to compact dtypes after loading
+            sheet: Excel sheet name or index (default: first sheet)
+            columns: Excel columns to read (default: all)
 
         Returns:
             Loaded DataFrame
@@ -31,49 +108,374 @@ class DataLoader:
         self.file_path = path
         suffix = path.suffix.lower()
 
+        self.parquet_path = None
+
         if suffix == ".csv":
             self.data = self._load_csv(path)
         elif suffix in [".xlsx", ".xls"]:
-            self.data = self._load_excel(path)
+            self.data = self._load_excel(path, sheet, columns)
+        elif suffix == ".parquet":
+            self.data = pd.read_parquet(path)
+            self.parquet_path = path
         else:
             raise ValueError(f"Unsupported file format: {suffix}")
 
+        self.memory_before_mb = None
+        if optimize:
+            self.memory_before_mb = self._memory_mb()
+            self.data = self.optimize_dtypes(self.data)
+            # Any existing Parquet file has the unoptimized dtypes
+            self.parquet_path = None
+
+        if cache and self.parquet_path is None:
+            self.write_parquet_cache()
+
+        self.fingerprint = self._source_fingerprint(path, sheet, columns, optimize)
+        remember_fingerprint(self.data, self.fingerprint)
         return self.data
 
+    def _source_fingerprint(
+        self, path: Path, sheet: Optional[str], columns: Optional[list], optimize: bool
+    ) -> str:
+        """Fingerprint of the loaded data from its source file and load options.
+
+        The file's size and modification time stand in for its contents, so
+        this is cheap no matter how large the data is.
+        """
+        stat = path.stat()
+        h = hashlib.sha1()
+        h.update(repr((str(path.resolve()), stat.st_mtime_ns, stat.st_size)).encode())
+        h.update(repr((sheet, columns, optimize, self.data.shape)).encode())
+        h.update(repr([(str(c), str(t)) for c, t in self.data.dtypes.items()]).encode())
+        return h.hexdigest()
+
+    def __setstate__(self, state: dict):
+        # The fingerprint is remembered per frame object, so re-register it
+        # for the unpickled frame
+        self.__dict__.update(state)
+        self.__dict__.setdefault("fingerprint", None)
+        if self.data is not None and self.fingerprint:
+            remember_fingerprint(self.data, self.fingerprint)
+
+    @staticmethod
+    def optimize_dtypes(data: pd.DataFrame) -> pd.DataFrame:
+        """Convert columns to compact dtypes.
+
+        - integers are downcast to the smallest type that holds their range
+        - floats are downcast to float32 when no precision is lost
+        - date strings (see DATE_PATTERN) are parsed to datetime64
+        - low-cardinality strings become ``category``
+        - other strings use Arrow-backed ``string`` storage
+        """
+        result = {}
+        for name, col in data.items():
+            if pd.api.types.is_bool_dtype(col):
+                result[name] = col
+            elif pd.api.types.is_integer_dtype(col):
+                result[name] = pd.to_numeric(col, downcast="integer")
+            elif pd.api.types.is_float_dtype(col):
+                downcast = col.astype(np.float32)
+                lossless = np.array_equal(
+                    downcast.to_numpy(dtype=np.float64), col.to_numpy(), equal_nan=True
+                )
+                result[name] = downcast if lossless else col
+            elif col.dtype == "object" or pd.api.types.is_string_dtype(col):
+                result[name] = DataLoader._optimize_text(col)
+            else:
+                result[name] = col
+        return pd.DataFrame(result, index=data.index)
+
+    @staticmethod
+    def _optimize_text(col: pd.Series) -> pd.Series:
+        """Pick a compact dtype for a text column."""
+        values = col.dropna()
+        if len(values) == 0 or not all(isinstance(v, str) for v in values.head(DATE_SAMPLE_ROWS)):
+            return col
+
+        dates = DataLoader._parse_dates(col, values.head(DATE_SAMPLE_ROWS))
+        if dates is not None:
+            return dates
+
+        if values.nunique() <= CATEGORY_MAX_RATIO * len(values):
+            return col.astype("category")
+
+        try:
+            return col.astype(pd.StringDtype("pyarrow"))
+        except (ImportError, TypeError):
+            return col
+
+    @staticmethod
+    def _parse_dates(col: pd.Series, sample: pd.Series) -> Optional[pd.Series]:
+        """``col`` as datetime64 if it holds dates, else None.
+
+        Most of the sample has to match DATE_PATTERN and parse with one
+        format, and then every value of the column has to parse, so a
+        column is never converted with values lost to NaT.
+        """
+        sample = sample.str.strip()
+        if sample.str.match(DATE_PATTERN).mean() < DATE_MIN_RATIO:
+            return None
+        for date_format in ("ISO8601", None):
+            with warnings.catch_warnings():
+                # format=None warns when it falls back to parsing each value
+                warnings.simplefilter("ignore", UserWarning)
+                parsed = pd.to_datetime(sample, format=date_format, errors="coerce")
+                if parsed.notna().mean() < DATE_MIN_RATIO:
+                    continue
+                try:
+                    return pd.to_datetime(col, format=date_format)
+                except (ValueError, TypeError, OverflowError):
+                    return None
+        return None
+
+    def _memory_mb(self) -> float:
+        return round(self.data.memory_usage(deep=True).sum() / 1024 / 1024, 2)
+
+    def write_parquet_cache(self) -> Optional[Path]:
+        """Write the loaded data to a Parquet file in the cache directory.
+
+        Returns:
+            Path to the Parquet file, or None if the data can't be stored as Parquet
+        """
+        if self.data is None:
+            raise ValueError("No data loaded")
+
+        self.cache_dir.mkdir(exist_ok=True)
+        path = cache_file(self.cache_dir, self.file_path)
+        try:
+            self.data.to_parquet(path, index=False)
+        except Exception:
+            # Mixed-type object columns can't be written by pyarrow
+            path.unlink(missing_ok=True)
+            return None
+
+        self.parquet_path = path
+        return path
+
+    def connect(self):
+        """Open a DuckDB connection with the loaded data registered as a table.
+
+        The table is named ``data``. It is a view over the Parquet cache when
+        one exists, or over the source CSV file otherwise, so queries are
+        executed by DuckDB directly on the files. Excel data without a cache
+        is registered from the in-memory DataFrame.
+        """
+        import duckdb
+
+        if self.data is None:
+            raise ValueError("No data loaded")
+
+        con = duckdb.connect()
+        if self.parquet_path is not None and self.parquet_path.exists():
+            con.execute(
+                f"CREATE VIEW {TABLE_NAME} AS "
+                f"SELECT * FROM read_parquet({_sql_string(self.parquet_path)})"
+            )
+        elif self.file_path.suffix.lower() == ".csv" and self.file_path.exists():
+            con.execute(
+                f"CREATE VIEW {TABLE_NAME} AS "
+                f"SELECT * FROM read_csv_auto({_sql_string(self.file_path)})"
+            )
+        else:
+            con.register(TABLE_NAME, self.data)
+        return con
+
+    def sql(self, query: str) -> pd.DataFrame:
+        """Run a SQL query against the loaded data (table name ``data``).
+
+        Args:
+            query: SQL query, e.g. "SELECT city, avg(age) FROM data GROUP BY city"
+
+        Returns:
+            Query result as a DataFrame
+        """
+        con = self.connect()
+        try:
+            return con.execute(query).df()
+        finally:
+            con.close()
+
     def _load_csv(self, path: Path) -> pd.DataFrame:
-        """Load CSV with auto-detection of encoding and delimiter."""
-        encodings = ["utf-8", "latin-1", "cp1252"]
-        delimiters = [",", ";", "\t", "|"]
+        """Load CSV with auto-detection of encoding and delimiter.
+
+        Both are detected once from the first CSV_SNIFF_BYTES of the file:
+        the first of CSV_ENCODINGS that decodes them, and the delimiter
+        csv.Sniffer finds in their complete lines (',' if it finds none).
+        """
+        with open(path, "rb") as f:
+            sample = f.read(CSV_SNIFF_BYTES)
+
+        for encoding in CSV_ENCODINGS:
+            try:
+                # Not final, so a character cut off at the end of the sample
+                # doesn't count as undecodable
+                text = codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            raise ValueError(f"Could not detect the encoding of CSV file: {path}")
+
+        lines = text[: text.rfind("\n")] if "\n" in text else text
+        try:
+            delimiter = csv.Sniffer().sniff(lines, delimiters=CSV_DELIMITERS).delimiter
+        except csv.Error:
+            delimiter = ","
+
+        try:
+            return pd.read_csv(
+                path,
+                encoding=encoding,
+                delimiter=delimiter,
+                encoding_errors="replace",
+            )
+        except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+            raise ValueError(f"Could not read CSV file: {path}: {e}") from e
+
+    def _load_excel(
+        self, path: Path, sheet: Optional[str] = None, columns: Optional[list] = None
+    ) -> pd.DataFrame:
+        """Load Excel file.
+
+        .xlsx files are streamed into the Parquet cache (see excel_to_parquet)
+        and read back from it; legacy .xls files are read with pandas.
+        """
+        if path.suffix.lower() == ".xls":
+            return pd.read_excel(path, sheet_name=sheet or 0, usecols=columns)
+
+        self.cache_dir.mkdir(exist_ok=True)
+        parquet_path = cache_file(self.cache_dir, path)
+        self.excel_to_parquet(path, parquet_path, sheet, columns)
+        self.parquet_path = parquet_path
+        return pd.read_parquet(parquet_path)
 
-        for encoding in encodings:
-            for delimiter in delimiters:
+    @staticmethod
+    def excel_to_parquet(
+        path: Path,
+        out_path: Path,
+        sheet: Optional[str] = None,
+        columns: Optional[list] = None,
+        chunk_rows: int = EXCEL_CHUNK_ROWS,
+    ) -> Path:
+        """Convert an .xlsx sheet to Parquet in bounded memory.
+
+        Rows are streamed with openpyxl in read-only mode and written as
+        Parquet parts of ``chunk_rows`` rows. DuckDB then merges the parts
+        into one file, unifying column types that differ between chunks.
+
+        Args:
+            path: Path to the .xlsx file
+            out_path: Parquet file to write
+            sheet: Sheet name or index (default: first sheet)
+            columns: Columns to keep (default: all)
+            chunk_rows: Rows held in memory at a time
+
+        Returns:
+            out_path
+        """
+        import duckdb
+
+        parts_dir = Path(f"{out_path}.parts")
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        parts_dir.mkdir(parents=True)
+
+        try:
+            names = None
+            for i, chunk in enumerate(
+                DataLoader._iter_excel_chunks(path, sheet, columns, chunk_rows)
+            ):
+                names = list(chunk.columns)
                 try:
-                    return pd.read_csv(
-                        path,
-                        encoding=encoding,
-                        delimiter=delimiter,
-                        encoding_errors="replace",
-                    )
+                    chunk.to_parquet(parts_dir / f"part-{i:06d}.parquet", index=False)
                 except Exception:
-                    continue
+                    # Columns mixing text and numbers are stored as text
+                    mixed = chunk.select_dtypes(include=["object"]).columns
+                    chunk[mixed] = chunk[mixed].apply(
+                        lambda col: col.map(lambda v: v if v is None else str(v))
+                    )
+                    chunk.to_parquet(parts_dir / f"part-{i:06d}.parquet", index=False)
+
+            if names is None:
+                raise ValueError(f"No data found in Excel file: {path}")
+
+            con = duckdb.connect()
+            try:
+                parts = _sql_string(parts_dir / "*.parquet")
+                con.execute(
+                    f"COPY (SELECT * FROM read_parquet({parts}, union_by_name = true)) "
+                    f"TO {_sql_string(out_path)} (FORMAT PARQUET)"
+                )
+            finally:
+                con.close()
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
 
-        raise ValueError(f"Could not read CSV file: {path}")
+        return out_path
 
-    def _load_excel(self, path: Path) -> pd.DataFrame:
-        """Load Excel file."""
-        return pd.read_excel(path, engine="openpyxl")
+    @staticmethod
+    def _iter_excel_chunks(
+        path: Path, sheet: Optional[str], columns: Optional[list], chunk_rows: int
+    ):
+        """Yield DataFrames of up to ``chunk_rows`` rows from an .xlsx sheet."""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            if sheet is None:
+                worksheet = workbook.worksheets[0]
+            elif str(sheet) in workbook.sheetnames:
+                # A sheet named "2024" is a name, not an index
+                worksheet = workbook[str(sheet)]
+            elif isinstance(sheet, int) or str(sheet).isdigit():
+                index = int(sheet)
+                if index >= len(workbook.worksheets):
+                    raise ValueError(
+                        f"Sheet index {index} out of range ({len(workbook.worksheets)} sheets)"
+                    )
+                worksheet = workbook.worksheets[index]
+            else:
+                raise ValueError(f"Sheet not found: {sheet}")
+
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+
+            names = header_names(header)
+            if columns:
+                missing = [c for c in columns if c not in names]
+                if missing:
+                    raise ValueError(f"Column not found: {', '.join(missing)}")
+                keep = [names.index(c) for c in columns]
+            else:
+                keep = list(range(len(names)))
+            selected = [names[i] for i in keep]
+
+            chunk = []
+            for row in rows:
+                if all(v is None for v in row):
+                    continue
+                chunk.append([row[i] if i < len(row) else None for i in keep])
+                if len(chunk) >= chunk_rows:
+                    yield pd.DataFrame(chunk, columns=selected)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=selected)
+        finally:
+            workbook.close()
 
     def get_info(self) -> dict:
         """Get basic info about loaded data."""
         if self.data is None:
             return {"status": "No data loaded"}
 
-        return {
+        info = {
             "rows": len(self.data),
             "columns": len(self.data.columns),
             "column_names": list(self.data.columns),
             "dtypes": {col: str(dtype) for col, dtype in self.data.dtypes.items()},
-            "memory_usage_mb": round(
-                self.data.memory_usage(deep=True).sum() / 1024 / 1024, 2
-            ),
+            "memory_usage_mb": self._memory_mb(),
         }
+        if self.memory_before_mb is not None:
+            info["memory_before_optimization_mb"] = self.memory_before_mb
+        return info
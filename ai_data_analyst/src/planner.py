@@ -0,0 +1,256 @@
+import json
+import pandas as pd
+from pandas.api import types
+from typing import Optional
+
+
+FILTER_OPS = {"==", "!=", ">", ">=", "<", "<=", "in", "not_in", "contains", "is_null", "not_null"}
+AGG_FUNCS = {"count", "sum", "mean", "median", "min", "max", "std", "nunique"}
+# Operators whose value is compared with the column's values
+COMPARISON_OPS = {"==", "!=", ">", ">=", "<", "<=", "in", "not_in"}
+# Aggregations that only make sense for numbers (mean and median also for dates)
+NUMERIC_AGGS = {"sum", "mean", "median", "std"}
+DATETIME_AGGS = {"mean", "median"}
+MAX_RESULT_ROWS = 50
+
+
+class QueryPlan:
+    """A validated, restricted query plan that runs locally against a DataFrame.
+
+    Plans are plain dicts (usually produced by the LLM as JSON) with the keys:
+        filters:      [{"column": str, "op": str, "value": any}]
+        group_by:     [str]
+        aggregations: [{"column": str, "func": str}]
+        select:       [str]  (only used when there are no aggregations)
+        sort_by:      {"column": str, "ascending": bool}
+        limit:        int
+    """
+
+    def __init__(self, plan: dict, columns: list, dtypes: Optional[dict] = None):
+        """
+        Args:
+            plan: The plan dict
+            columns: Column names of the data
+            dtypes: {column: dtype}; if given, filter values are coerced to
+                the column types and aggregations are checked against them
+        """
+        if not isinstance(plan, dict):
+            raise ValueError("Query plan must be a JSON object")
+
+        self.columns = [str(c) for c in columns]
+        self.dtypes = {str(c): t for c, t in (dtypes or {}).items()}
+        self.filters = plan.get("filters") or []
+        self.group_by = plan.get("group_by") or []
+        self.aggregations = plan.get("aggregations") or []
+        self.select = plan.get("select") or []
+        self.sort_by = plan.get("sort_by")
+        self.limit = plan.get("limit")
+
+        self._validate()
+
+    @classmethod
+    def from_json(cls, text: str, columns: list, dtypes: Optional[dict] = None) -> "QueryPlan":
+        """Parse a plan from LLM output, tolerating markdown code fences."""
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            if text.lower().startswith("json"):
+                text = text[4:]
+        try:
+            plan = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Query plan is not valid JSON: {e}")
+        return cls(plan, columns, dtypes)
+
+    @classmethod
+    def for_data(cls, text: str, data: pd.DataFrame) -> "QueryPlan":
+        """Parse a plan from LLM output and validate it against a DataFrame."""
+        return cls.from_json(text, list(data.columns), dict(data.dtypes.items()))
+
+    def _check_column(self, column) -> None:
+        if column not in self.columns:
+            raise ValueError(f"Column not found: {column}")
+
+    @staticmethod
+    def _parse_bool(value) -> Optional[bool]:
+        """A bool, or the string "true"/"false" in any case; None for anything else."""
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        return None
+
+    def _check_names(self, key: str, names) -> None:
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+            raise ValueError(f"{key} must be a list of column names")
+        for name in names:
+            self._check_column(name)
+
+    def _coerce(self, column: str, value):
+        """Convert a filter value to the type of the column's values."""
+        dtype = self.dtypes.get(column)
+        if dtype is None or value is None:
+            return value
+        if types.is_bool_dtype(dtype):
+            flag = self._parse_bool(value)
+            if flag is not None:
+                return flag
+        elif types.is_numeric_dtype(dtype):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                pass
+            else:
+                return int(number) if number.is_integer() else number
+        elif types.is_datetime64_any_dtype(dtype):
+            try:
+                timestamp = pd.Timestamp(value)
+            except (TypeError, ValueError):
+                pass
+            else:
+                tz = getattr(dtype, "tz", None)
+                if tz is not None:
+                    return timestamp.tz_localize(tz) if timestamp.tzinfo is None else timestamp.tz_convert(tz)
+                return timestamp.tz_localize(None) if timestamp.tzinfo is None else timestamp.tz_convert(None)
+        else:
+            return value if isinstance(value, str) else str(value)
+        raise ValueError(f"Value {value!r} does not match the type of column {column} ({dtype})")
+
+    def _validate(self) -> None:
+        for key in ("filters", "aggregations"):
+            if not isinstance(getattr(self, key), list):
+                raise ValueError(f"{key} must be a list")
+
+        filters = []
+        for f in self.filters:
+            if not isinstance(f, dict):
+                raise ValueError("Each filter must be an object with 'column' and 'op' keys")
+            self._check_column(f.get("column"))
+            if f.get("op") not in FILTER_OPS:
+                raise ValueError(f"Unsupported filter operator: {f.get('op')}")
+            if f["op"] in ("in", "not_in") and not isinstance(f.get("value"), list):
+                raise ValueError(f"Operator {f['op']} requires a list value")
+
+            if f["op"] in COMPARISON_OPS:
+                if f["op"] in ("in", "not_in"):
+                    f = {**f, "value": [self._coerce(f["column"], v) for v in f["value"]]}
+                else:
+                    f = {**f, "value": self._coerce(f["column"], f.get("value"))}
+            filters.append(f)
+        self.filters = filters
+
+        self._check_names("group_by", self.group_by)
+
+        for agg in self.aggregations:
+            if not isinstance(agg, dict):
+                raise ValueError("Each aggregation must be an object with 'column' and 'func' keys")
+            if agg.get("func") not in AGG_FUNCS:
+                raise ValueError(f"Unsupported aggregation: {agg.get('func')}")
+            # count may be taken over all rows with column "*"
+            if not (agg["func"] == "count" and agg.get("column") == "*"):
+                self._check_column(agg.get("column"))
+                self._check_aggregation(agg["column"], agg["func"])
+
+        self._check_names("select", self.select)
+
+        if self.group_by and not self.aggregations:
+            raise ValueError("group_by requires at least one aggregation")
+
+        if self.sort_by is not None:
+            if not isinstance(self.sort_by, dict) or "column" not in self.sort_by:
+                raise ValueError("sort_by must be an object with a 'column' key")
+            ascending = self._parse_bool(self.sort_by.get("ascending", True))
+            if ascending is None:
+                raise ValueError(
+                    f"sort_by ascending must be true or false, not {self.sort_by['ascending']!r}"
+                )
+            self.sort_by = {**self.sort_by, "ascending": ascending}
+
+        if self.limit is not None:
+            if not isinstance(self.limit, int) or isinstance(self.limit, bool) or self.limit < 1:
+                raise ValueError("limit must be a positive integer")
+
+    def _check_aggregation(self, column: str, func: str) -> None:
+        dtype = self.dtypes.get(column)
+        if dtype is None:
+            return
+        numeric = types.is_numeric_dtype(dtype)
+        if func in NUMERIC_AGGS and not numeric:
+            if not (func in DATETIME_AGGS and types.is_datetime64_any_dtype(dtype)):
+                raise ValueError(f"Cannot take {func} of non-numeric column {column} ({dtype})")
+        if func in ("min", "max") and isinstance(dtype, pd.CategoricalDtype) and not dtype.ordered:
+            raise ValueError(f"Cannot take {func} of unordered categorical column {column}")
+
+    def _mask(self, data: pd.DataFrame) -> Optional[pd.Series]:
+        mask = None
+        for f in self.filters:
+            col = data[f["column"]]
+            op, value = f["op"], f.get("value")
+            # Unordered categories can't be compared with < or >
+            if op in (">", ">=", "<", "<=") and isinstance(col.dtype, pd.CategoricalDtype):
+                col = col.astype(object)
+
+            if op == "==":
+                m = col == value
+            elif op == "!=":
+                m = col != value
+            elif op == ">":
+                m = col > value
+            elif op == ">=":
+                m = col >= value
+            elif op == "<":
+                m = col < value
+            elif op == "<=":
+                m = col <= value
+            elif op == "in":
+                m = col.isin(value)
+            elif op == "not_in":
+                m = ~col.isin(value)
+            elif op == "contains":
+                m = col.astype(str).str.contains(str(value), case=False, regex=False)
+            elif op == "is_null":
+                m = col.isnull()
+            else:
+                m = col.notnull()
+
+            mask = m if mask is None else mask & m
+        return mask
+
+    def execute(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Run the plan with vectorized pandas operations."""
+        mask = self._mask(data)
+        if mask is not None:
+            data = data[mask]
+
+        if self.aggregations:
+            named = {}
+            for agg in self.aggregations:
+                column, func = agg["column"], agg["func"]
+                if column == "*":
+                    column = self.group_by[0] if self.group_by else data.columns[0]
+                    func = "size"
+                named[f"{agg['func']}_{agg['column']}".replace("*", "rows")] = (column, func)
+
+            if self.group_by:
+                result = data.groupby(self.group_by, observed=True).agg(**named)
+                result = result.reset_index()
+            else:
+                result = pd.DataFrame(
+                    {
+                        name: [len(data) if func == "size" else data[col].agg(func)]
+                        for name, (col, func) in named.items()
+                    }
+                )
+        else:
+            result = data[self.select] if self.select else data
+
+        if self.sort_by is not None:
+            sort_col = self.sort_by["column"]
+            if sort_col not in result.columns:
+                raise ValueError(f"Cannot sort by column not in result: {sort_col}")
+            result = result.sort_values(sort_col, ascending=self.sort_by["ascending"])
+
+        limit = min(self.limit or MAX_RESULT_ROWS, MAX_RESULT_ROWS)
+        return result.head(limit)
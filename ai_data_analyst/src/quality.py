@@ -0,0 +1,147 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+RULE_TYPES = {"max_null_rate", "range", "regex", "unique", "outlier"}
+DEFAULT_MAX_NULL_RATE = 0.5
+DEFAULT_Z_SCORE = 3.0
+EXAMPLE_ROWS = 5
+# Numeric settings of each rule type; all are optional
+NUMERIC_KEYS = {"max_null_rate": ("max",), "range": ("min", "max"), "outlier": ("z",)}
+
+
+def row_hashes(data: pd.DataFrame, columns: Optional[list] = None) -> np.ndarray:
+    """Hash each row (or the given columns of each row) to a uint64."""
+    frame = data if columns is None else data[columns]
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def count_duplicates(data: pd.DataFrame, columns: Optional[list] = None) -> int:
+    """Count rows that repeat an earlier row, comparing compact row hashes."""
+    hashes = row_hashes(data, columns)
+    return int(len(hashes) - len(pd.unique(hashes)))
+
+
+def default_rules(data: pd.DataFrame) -> list:
+    """Null-rate checks for every column and outlier checks for numeric ones."""
+    rules = [
+        {"type": "max_null_rate", "column": str(col), "max": DEFAULT_MAX_NULL_RATE}
+        for col in data.columns
+    ]
+    rules += [
+        {"type": "outlier", "column": str(col), "z": DEFAULT_Z_SCORE}
+        for col in data.select_dtypes(include=[np.number]).columns
+        if not pd.api.types.is_bool_dtype(data[col])
+    ]
+    return rules
+
+
+class QualityChecker:
+    """Run declarative data-quality rules with vectorized column operations.
+
+    Rules are dicts with a "type" key:
+        {"type": "max_null_rate", "column": str, "max": float}
+        {"type": "range", "column": str, "min": number, "max": number}
+        {"type": "regex", "column": str, "pattern": str}
+        {"type": "unique", "columns": [str]}
+        {"type": "outlier", "column": str, "z": float}
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+
+    def validate(self, rules: list) -> None:
+        for rule in rules:
+            if not isinstance(rule, dict):
+                raise ValueError("Each rule must be an object with a 'type' key")
+            if rule.get("type") not in RULE_TYPES:
+                raise ValueError(f"Unknown rule type: {rule.get('type')}")
+            if rule["type"] == "unique":
+                columns = rule.get("columns")
+                if not isinstance(columns, list) or not columns:
+                    raise ValueError("A unique rule needs a non-empty 'columns' list")
+            else:
+                columns = [rule.get("column")]
+            for col in columns:
+                if col not in self.data.columns:
+                    raise ValueError(f"Column not found: {col}")
+            if rule["type"] == "regex":
+                try:
+                    re.compile(rule.get("pattern", ""))
+                except (re.error, TypeError) as e:
+                    raise ValueError(f"Invalid pattern {rule.get('pattern')!r}: {e}")
+            for key in NUMERIC_KEYS.get(rule["type"], ()):
+                value = rule.get(key)
+                # A range bound may be null to leave that side open
+                if value is None and (key not in rule or rule["type"] == "range"):
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(
+                        f"'{key}' of the {rule['type']} rule on {rule['column']} "
+                        f"must be a number, not {value!r}"
+                    )
+
+    def run(self, rules: Optional[list] = None) -> dict:
+        """Run the rules (or default_rules) and return a report."""
+        if rules is None:
+            rules = default_rules(self.data)
+        self.validate(rules)
+
+        checks = [self._check(rule) for rule in rules]
+        return {
+            "rows": len(self.data),
+            "duplicate_rows": count_duplicates(self.data),
+            "passed": sum(c["passed"] for c in checks),
+            "failed": sum(not c["passed"] for c in checks),
+            "checks": checks,
+        }
+
+    def _check(self, rule: dict) -> dict:
+        kind = rule["type"]
+        result = {"rule": rule}
+
+        if kind == "max_null_rate":
+            col = self.data[rule["column"]]
+            nulls = int(col.isnull().sum())
+            rate = nulls / len(col) if len(col) else 0.0
+            result.update(
+                passed=rate <= rule.get("max", DEFAULT_MAX_NULL_RATE),
+                failed_rows=nulls,
+                null_rate=round(rate, 4),
+            )
+            return result
+
+        if kind == "unique":
+            duplicates = count_duplicates(self.data, rule["columns"])
+            result.update(passed=duplicates == 0, failed_rows=duplicates)
+            return result
+
+        col = self.data[rule["column"]]
+        if kind == "range":
+            values = pd.to_numeric(col, errors="coerce")
+            bad = pd.Series(False, index=col.index)
+            if rule.get("min") is not None:
+                bad |= values < rule["min"]
+            if rule.get("max") is not None:
+                bad |= values > rule["max"]
+        elif kind == "regex":
+            text = col.dropna().astype(str)
+            matches = text.str.fullmatch(rule["pattern"])
+            bad = pd.Series(False, index=col.index)
+            bad.loc[text.index] = ~matches.fillna(False).astype(bool)
+        else:
+            values = pd.to_numeric(col, errors="coerce").to_numpy(dtype=np.float64)
+            mean = np.nanmean(values) if len(values) else np.nan
+            std = np.nanstd(values) if len(values) else np.nan
+            with np.errstate(invalid="ignore", divide="ignore"):
+                z = np.abs(values - mean) / std
+            bad = pd.Series(np.nan_to_num(z, nan=0.0) > rule.get("z", DEFAULT_Z_SCORE), index=col.index)
+
+        failed = int(bad.sum())
+        result.update(passed=failed == 0, failed_rows=failed)
+        if failed:
+            examples = col[bad.to_numpy()].head(EXAMPLE_ROWS)
+            result["examples"] = {str(k): str(v) for k, v in examples.items()}
+        return result
@@ -1,14 +1,31 @@
 import os
-import json
-from openai import OpenAI
-from typing import Optional
+import random
+import asyncio
+from openai import OpenAI, AsyncOpenAI, RateLimitError, APIConnectionError, APITimeoutError
+from typing import Optional, AsyncIterator
 import pandas as pd
+from src.planner import QueryPlan, FILTER_OPS, AGG_FUNCS
+from src.context import SchemaDigest, get_digest
+
+
+MODEL = "gpt-4o-mini"
+MAX_RETRIES = 6
+RETRY_BASE_DELAY = 1.0
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError)
 
 
 class DataQuery:
     """Answer natural language questions about data using LLM."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        max_context_tokens: int = 1000,
+    ):
+        self.cache_dir = cache_dir
+        self.max_context_tokens = max_context_tokens
+
         if api_key is None:
             api_key = os.getenv("OPENAI_API_KEY")
 
@@ -17,13 +34,128 @@ class DataQuery:
                 "OpenAI API key required. Set OPENAI_API_KEY env var or pass as parameter."
             )
 
+        self.api_key = api_key
         self.client = OpenAI(api_key=api_key)
+        self._async_client: Optional[AsyncOpenAI] = None
 
     def ask(self, question: str, data: pd.DataFrame) -> str:
         """Answer a question about the data."""
-        context = self._build_context(data)
-
-        prompt = f"""You are a data analyst. Based on the following dataset information, answer the user's question.
+        return self._complete(self._question_prompt(question, data))
+
+    def ask_workspace(self, question: str, workspace, names: Optional[list] = None) -> str:
+        """Answer a question that may involve several workspace datasets.
+
+        Context comes from the digests stored in the workspace, so datasets
+        are not loaded into memory. The token budget is split between them.
+        """
+        names = names or workspace.names()
+        if not names:
+            raise ValueError("Workspace is empty")
+
+        budget = max(self.max_context_tokens // len(names), 100)
+        sections = [
+            f"Dataset '{name}':\n{workspace.digest(name).render(question, budget)}"
+            for name in names
+        ]
+        return self._complete(self._context_prompt(question, "\n\n".join(sections)))
+
+    def ask_exact(self, question: str, data: pd.DataFrame) -> str:
+        """Answer a question by running an LLM-generated query plan locally.
+
+        The LLM only sees the column names and types. It emits a restricted
+        query plan, which is validated and executed against the full data;
+        only the small result table is sent back for phrasing the answer.
+        """
+        plan = self.plan(question, data)
+        result = plan.execute(data)
+        return self._complete(self._result_prompt(question, data, result))
+
+    def plan(self, question: str, data: pd.DataFrame) -> QueryPlan:
+        """Ask the LLM for a query plan and validate it against the data."""
+        reply = self._complete(self._plan_prompt(question, data), temperature=0)
+        return QueryPlan.for_data(reply, data)
+
+    async def ask_async(
+        self,
+        question: str,
+        data: pd.DataFrame,
+        exact: bool = False,
+        digest: Optional[SchemaDigest] = None,
+    ) -> str:
+        """Async version of ask/ask_exact that retries on rate limits.
+
+        ``digest`` is the schema digest of ``data`` when the caller already
+        has it (see ask_batch); otherwise it is looked up in a thread, as
+        the first lookup for a dataset scans it.
+        """
+        if not exact:
+            if digest is None:
+                digest = await asyncio.to_thread(get_digest, data, self.cache_dir)
+            context = digest.render(question, self.max_context_tokens)
+            return await self._complete_async(self._context_prompt(question, context))
+
+        reply = await self._complete_async(
+            self._plan_prompt(question, data), temperature=0
+        )
+        plan = QueryPlan.for_data(reply, data)
+        # Executing a plan over a large frame takes a while; keep the event
+        # loop free for the other questions' API calls meanwhile
+        result = await asyncio.to_thread(plan.execute, data)
+        return await self._complete_async(self._result_prompt(question, data, result))
+
+    async def ask_batch(
+        self,
+        questions: list,
+        data: pd.DataFrame,
+        exact: bool = False,
+        concurrency: int = 8,
+    ) -> AsyncIterator[dict]:
+        """Answer many questions concurrently, yielding results as they finish.
+
+        Args:
+            questions: List of {"id": ..., "question": str} dicts
+            data: Dataset to answer questions about
+            exact: Use query plans (see ask_exact) instead of the data summary
+            concurrency: Maximum number of questions in flight at once
+
+        Yields:
+            {"id", "question", "answer"} dicts, or {"id", "question", "error"}
+            for questions that failed
+        """
+        # Look up the schema digest once, off the event loop, and share it
+        # with every task; exact mode only sends the column types
+        digest = None
+        if not exact:
+            digest = await asyncio.to_thread(get_digest, data, self.cache_dir)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(item: dict) -> dict:
+            async with semaphore:
+                result = {"id": item["id"], "question": item["question"]}
+                try:
+                    result["answer"] = await self.ask_async(
+                        item["question"], data, exact, digest
+                    )
+                except Exception as e:
+                    result["error"] = str(e)
+                return result
+
+        # The async client is bound to the running event loop, so every batch
+        # (each in its own asyncio.run) gets a new one, closed at the end
+        self._async_client = AsyncOpenAI(api_key=self.api_key)
+        try:
+            tasks = [asyncio.create_task(run(item)) for item in questions]
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            client, self._async_client = self._async_client, None
+            await client.close()
+
+    def _question_prompt(self, question: str, data: pd.DataFrame) -> str:
+        return self._context_prompt(question, self._build_context(data, question))
+
+    def _context_prompt(self, question: str, context: str) -> str:
+        return f"""You are a data analyst. Based on the following dataset information, answer the user's question.
 
 Dataset Summary:
 {context}
@@ -32,37 +164,82 @@ User Question: {question}
 
 Provide a clear, concise answer. If calculations are needed, show the result. Format any data as a table if helpful."""
 
-        response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful data analyst assistant.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-        )
+    def _result_prompt(
+        self, question: str, data: pd.DataFrame, result: pd.DataFrame
+    ) -> str:
+        return f"""You are a data analyst. The user's question was answered by running a query over the full dataset ({data.shape[0]} rows).
 
-        return response.choices[0].message.content
+User Question: {question}
+
+Query result:
+{result.to_string(index=False)}
 
-    def _build_context(self, data: pd.DataFrame) -> str:
-        """Build context string from data for the LLM."""
-        lines = []
-        lines.append(f"Shape: {data.shape[0]} rows, {data.shape[1]} columns\n")
+Answer the question using only this result. Be clear and concise. Format data as a table if helpful."""
 
-        lines.append("Columns:")
-        for col in data.columns:
-            dtype = str(data[col].dtype)
-            nulls = data[col].isnull().sum()
-            lines.append(f"  - {col}: {dtype} ({nulls} nulls)")
+    def _plan_prompt(self, question: str, data: pd.DataFrame) -> str:
+        schema = "\n".join(f"  - {col}: {dtype}" for col, dtype in data.dtypes.items())
 
-        lines.append("\nSample data (first 5 rows):")
-        lines.append(data.head().to_string())
+        return f"""Translate the user's question into a JSON query plan over a table with these columns:
+{schema}
 
-        lines.append("\nNumeric column statistics:")
-        numeric = data.select_dtypes(include=["number"]).columns
-        if len(numeric) > 0:
-            lines.append(data[numeric].describe().to_string())
+The plan is a JSON object with these optional keys:
+  "filters": [{{"column": str, "op": one of {sorted(FILTER_OPS)}, "value": any}}]
+  "group_by": [column names]
+  "aggregations": [{{"column": str or "*", "func": one of {sorted(AGG_FUNCS)}}}]
+  "select": [column names] (only when there are no aggregations)
+  "sort_by": {{"column": str, "ascending": bool}}
+  "limit": int
+
+Aggregation result columns are named "<func>_<column>" ("count_rows" for count of "*").
+
+User Question: {question}
+
+Respond with the JSON object only."""
+
+    @staticmethod
+    def _messages(prompt: str) -> list:
+        return [
+            {
+                "role": "system",
+                "content": "You are a helpful data analyst assistant.",
+            },
+            {"role": "user", "content": prompt},
+        ]
+
+    def _complete(self, prompt: str, temperature: float = 0.2) -> str:
+        """Send a single prompt to the LLM and return the reply text."""
+        response = self.client.chat.completions.create(
+            model=MODEL,
+            messages=self._messages(prompt),
+            temperature=temperature,
+        )
+
+        return response.choices[0].message.content
 
-        return "\n".join(lines)
+    async def _complete_async(self, prompt: str, temperature: float = 0.2) -> str:
+        """Async _complete with exponential backoff on rate limits and timeouts."""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self.api_key)
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                response = await self._async_client.chat.completions.create(
+                    model=MODEL,
+                    messages=self._messages(prompt),
+                    temperature=temperature,
+                )
+                return response.choices[0].message.content
+            except RETRYABLE_ERRORS:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                delay = RETRY_BASE_DELAY * 2**attempt
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+    def _build_context(self, data: pd.DataFrame, question: str = "") -> str:
+        """Build context string from data for the LLM.
+
+        Uses a cached schema digest, so the data is only scanned the first
+        time a dataset is seen, and the prompt stays within the token budget.
+        """
+        digest = get_digest(data, self.cache_dir)
+        return digest.render(question, self.max_context_tokens)
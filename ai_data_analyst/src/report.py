@@ -0,0 +1,127 @@
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from src.visualizer import DataVisualizer
+
+
+MANIFEST_FILE = ".plot_manifest.json"
+BAR_MAX_UNIQUE = 50
+
+_worker_visualizer: Optional[DataVisualizer] = None
+
+
+def plan_report(data: pd.DataFrame) -> list:
+    """List the plots for a full report as (method, columns, kwargs, filename).
+
+    Histograms and box plots for every numeric column, bar charts for
+    categorical columns with at most BAR_MAX_UNIQUE values, a correlation
+    heatmap when there are at least two numeric columns, and line plots of
+    every numeric column over the first datetime column.
+    """
+    numeric = list(data.select_dtypes(include=[np.number]).columns)
+    categorical = list(data.select_dtypes(include=["object", "category", "string"]).columns)
+    datetimes = list(data.select_dtypes(include=["datetime64", "datetimetz"]).columns)
+
+    jobs = []
+    for col in numeric:
+        jobs.append(("histogram", [col], {"column": col}, f"histogram_{col}.png"))
+        jobs.append(("box_plot", [col], {"column": col}, f"boxplot_{col}.png"))
+    for col in categorical:
+        if data[col].nunique() <= BAR_MAX_UNIQUE:
+            jobs.append(("bar_chart", [col], {"column": col}, f"bar_{col}.png"))
+    if len(numeric) >= 2:
+        jobs.append(("correlation_heatmap", numeric, {}, "correlation_heatmap.png"))
+    if datetimes:
+        time_col = datetimes[0]
+        for col in numeric:
+            jobs.append(
+                (
+                    "timeseries_plot",
+                    [time_col, col],
+                    {"column": col, "time_column": time_col},
+                    f"timeseries_{col}.png",
+                )
+            )
+    return jobs
+
+
+def content_hash(data: pd.DataFrame, method: str, columns: list, kwargs: dict) -> str:
+    """Hash the column data together with the plot parameters."""
+    h = hashlib.sha1()
+    h.update(json.dumps([method, columns, kwargs], sort_keys=True, default=str).encode())
+    h.update(repr([str(t) for t in data[columns].dtypes]).encode())
+    h.update(pd.util.hash_pandas_object(data[columns], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _render(method: str, frame: pd.DataFrame, kwargs: dict, output_dir: str) -> str:
+    """Render one plot, reusing a per-process visualizer and its figures."""
+    global _worker_visualizer
+    if _worker_visualizer is None or str(_worker_visualizer.output_dir) != output_dir:
+        _worker_visualizer = DataVisualizer(frame, output_dir, reuse_figures=True)
+    _worker_visualizer.data = frame
+    return getattr(_worker_visualizer, method)(**kwargs)
+
+
+def generate_report(
+    data: pd.DataFrame,
+    output_dir: str = "outputs",
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> list:
+    """Render all report plots, skipping ones whose inputs haven't changed.
+
+    Args:
+        data: Dataset to plot
+        output_dir: Directory for the PNG files and the hash manifest
+        workers: Number of worker processes (1 renders in this process)
+        force: Re-render every plot even if it is unchanged
+
+    Returns:
+        List of {"path", "status"} dicts where status is "rendered",
+        "unchanged" or "error: ..."
+    """
+    out = Path(output_dir)
+    out.mkdir(exist_ok=True)
+    manifest_path = out / MANIFEST_FILE
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    results = []
+    pending = []
+    for method, columns, kwargs, filename in plan_report(data):
+        digest = content_hash(data, method, columns, kwargs)
+        if not force and manifest.get(filename) == digest and (out / filename).exists():
+            results.append({"path": str(out / filename), "status": "unchanged"})
+        else:
+            pending.append((method, columns, kwargs, filename, digest))
+
+    def record(filename: str, digest: str, future_or_call) -> None:
+        try:
+            path = future_or_call()
+            manifest[filename] = digest
+            results.append({"path": path, "status": "rendered"})
+        except Exception as e:
+            results.append({"path": str(out / filename), "status": f"error: {e}"})
+
+    if workers == 1 or len(pending) <= 1:
+        for method, columns, kwargs, filename, digest in pending:
+            record(
+                filename,
+                digest,
+                lambda: _render(method, data[columns], kwargs, str(out)),
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (filename, digest, pool.submit(_render, method, data[columns], kwargs, str(out)))
+                for method, columns, kwargs, filename, digest in pending
+            ]
+            for filename, digest, future in futures:
+                record(filename, digest, future.result)
+
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return results
@@ -0,0 +1,241 @@
+"""Local analyst daemon that runs CLI commands in a warm process.
+
+The server keeps the unpickled session state, imported libraries and the
+OpenAI client in memory between commands. CLI invocations in the same
+directory find it through SERVER_FILE and forward their arguments to it.
+The command's output is streamed back as it is produced, one JSON line per
+write, followed by a line with the exit code.
+
+A command only runs locally when no server is running. Once a command has
+been sent, failures and timeouts are reported instead of running it a
+second time.
+
+The server only listens on the loopback interface. SERVER_FILE is only
+readable by its owner and holds a random token that every request must
+send in TOKEN_HEADER, so other local users and web pages can't run
+commands.
+"""
+import io
+import os
+import sys
+import hmac
+import json
+import secrets
+import threading
+from pathlib import Path
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Optional
+
+
+SERVER_FILE = ".ai_data_analyst_server.json"
+HOST = "127.0.0.1"
+TOKEN_HEADER = "X-Analyst-Token"
+FORWARD_TIMEOUT = 600
+
+# Set in the daemon process so commands run locally instead of forwarding
+in_server = False
+
+
+class ServerError(Exception):
+    """A forwarded command failed or timed out on the server."""
+
+
+_command_lock = threading.Lock()
+
+
+class _OutputStream(io.TextIOBase):
+    """Text stream that sends every write to the client as a JSON line."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.connected = True
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        # click probes for binary streams by writing b""
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        if text and self.connected:
+            try:
+                self.wfile.write(json.dumps({"output": text}).encode() + b"\n")
+                self.wfile.flush()
+            except OSError:
+                # The client went away; let the command finish regardless
+                self.connected = False
+        return len(text)
+
+
+def run_command(cli, args: list, out: io.TextIOBase) -> int:
+    """Run a CLI command in this process, writing its output to ``out``.
+
+    Commands are serialized: output capture redirects the process-wide
+    stdout, and matplotlib is not thread-safe.
+
+    Returns:
+        The command's exit code
+    """
+    import click
+
+    exit_code = 0
+    with _command_lock, redirect_stdout(out), redirect_stderr(out):
+        try:
+            cli.main(args, prog_name="main.py", standalone_mode=False)
+        except click.exceptions.Exit as e:
+            exit_code = e.exit_code
+        except click.ClickException as e:
+            e.show(file=out)
+            exit_code = e.exit_code
+        except Exception as e:
+            out.write(f"Error: {e}\n")
+            exit_code = 1
+    return exit_code
+
+
+def _write_server_file(address: dict) -> None:
+    """Write SERVER_FILE readable and writable only by the current user."""
+    path = Path(SERVER_FILE)
+    path.unlink(missing_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(address, f)
+
+
+def serve(cli, port: int = 0) -> None:
+    """Serve CLI commands over HTTP until interrupted or asked to stop."""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    global in_server
+    in_server = True
+    token = secrets.token_hex(32)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+            if content_type != "application/json":
+                return self.send_error(415, "Expected application/json")
+            # Browsers always send an Origin with cross-site POSTs; the CLI never does
+            if self.headers.get("Origin") is not None:
+                return self.send_error(403, "Cross-origin requests are not allowed")
+            if not hmac.compare_digest(self.headers.get(TOKEN_HEADER, ""), token):
+                return self.send_error(403, "Missing or invalid token")
+
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self.send_error(400, "Invalid JSON")
+            args = request.get("args", []) if isinstance(request, dict) else None
+            if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+                return self.send_error(400, "Expected {\"args\": [str, ...]}")
+
+            # No Content-Length: the response ends when the connection closes
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            out = _OutputStream(self.wfile)
+            if self.path == "/shutdown":
+                out.write("Server stopped.\n")
+                exit_code = 0
+                threading.Thread(target=server.shutdown, daemon=True).start()
+            else:
+                exit_code = run_command(cli, args, out)
+            if out.connected:
+                self.wfile.write(json.dumps({"exit_code": exit_code}).encode() + b"\n")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((HOST, port), Handler)
+    host, port = server.server_address[:2]
+    _write_server_file({"host": host, "port": port, "pid": os.getpid(), "token": token})
+    print(f"Serving on http://{host}:{port} (Ctrl+C to stop)", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        Path(SERVER_FILE).unlink(missing_ok=True)
+
+
+def _request(path: str, payload: dict, output=None) -> Optional[int]:
+    """POST to the running server and stream its output to ``output``.
+
+    Returns:
+        The command's exit code, or None if no server is running
+
+    Raises:
+        ServerError: The server rejected the request, failed or timed out
+    """
+    server_file = Path(SERVER_FILE)
+    if not server_file.exists():
+        return None
+
+    import urllib.request
+    import urllib.error
+
+    address = json.loads(server_file.read_text())
+    request = urllib.request.Request(
+        f"http://{address['host']}:{address['port']}{path}",
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json", TOKEN_HEADER: address.get("token", "")},
+    )
+    timed_out = ServerError(
+        f"No response from the server for {FORWARD_TIMEOUT}s; "
+        "the command may still be running there"
+    )
+    try:
+        response = urllib.request.urlopen(request, timeout=FORWARD_TIMEOUT)
+    except urllib.error.HTTPError as e:
+        raise ServerError(f"Server rejected the command: {e.code} {e.reason}") from e
+    except urllib.error.URLError as e:
+        if isinstance(e.reason, ConnectionRefusedError):
+            # Server died without cleaning up; nothing was sent, so the
+            # command can run locally
+            server_file.unlink(missing_ok=True)
+            return None
+        if isinstance(e.reason, TimeoutError):
+            raise timed_out from e
+        raise ServerError(f"Could not reach the server: {e.reason}") from e
+    except TimeoutError as e:
+        raise timed_out from e
+    except OSError as e:
+        raise ServerError(f"Lost the connection to the server: {e}") from e
+
+    # The command may be running on the server from here on, so errors are
+    # reported rather than running it again locally
+    with response:
+        try:
+            for line in response:
+                message = json.loads(line)
+                if "exit_code" in message:
+                    return message["exit_code"]
+                if output is not None:
+                    output.write(message["output"])
+                    output.flush()
+        except TimeoutError as e:
+            raise timed_out from e
+        except (OSError, ValueError) as e:
+            raise ServerError(f"Lost the connection to the server: {e}") from e
+    raise ServerError("Server closed the connection before the command finished")
+
+
+def forward(args: list) -> Optional[int]:
+    """Run a command on the server if one is running for this directory.
+
+    The output is streamed to stdout as the server produces it.
+
+    Returns:
+        The command's exit code, or None if no server is running
+    """
+    if in_server:
+        return None
+    return _request("/", {"args": args}, sys.stdout)
+
+
+def stop() -> bool:
+    """Ask the running server to shut down. Returns False if none is running."""
+    return _request("/shutdown", {}) is not None
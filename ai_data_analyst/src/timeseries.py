@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+from typing import Optional, Union
+from src.context import fingerprint
+
+
+AGG_FUNCS = {"mean", "sum", "min", "max", "count", "median", "std", "first", "last"}
+ROLLING_STATS = ["mean", "std", "min", "max"]
+GAP_FACTOR = 3.0
+LTTB_POINTS = 2_000
+
+# Sorted time indexes for the most recently seen dataset, per time column
+_cache = {"key": None, "indexes": {}}
+
+
+def _session(data: pd.DataFrame) -> dict:
+    """Return the cache for this dataset, dropping caches of other datasets."""
+    key = fingerprint(data)
+    if _cache["key"] != key:
+        _cache.update(key=key, indexes={})
+    return _cache
+
+
+def datetime_columns(data: pd.DataFrame) -> list:
+    return list(data.select_dtypes(include=["datetime64", "datetimetz"]).columns)
+
+
+def time_column(data: pd.DataFrame, column: Optional[str] = None) -> str:
+    """Return ``column``, or the first datetime column when it is None."""
+    if column is not None:
+        if column not in data.columns:
+            raise ValueError(f"Column not found: {column}")
+        return column
+    columns = datetime_columns(data)
+    if not columns:
+        raise ValueError("No datetime column found (use --optimize when loading)")
+    return columns[0]
+
+
+def sorted_index(data: pd.DataFrame, column: str) -> tuple:
+    """Sort the rows by a time column once per dataset and column.
+
+    Text columns are parsed as dates. Rows with missing timestamps are
+    left out.
+
+    Returns:
+        (index, order) where index is the sorted DatetimeIndex and order
+        holds the matching row positions in ``data``
+    """
+    session = _session(data)
+    if column in session["indexes"]:
+        return session["indexes"][column]
+
+    col = data[column]
+    if not pd.api.types.is_datetime64_any_dtype(col):
+        try:
+            col = pd.to_datetime(col, format="ISO8601")
+        except (ValueError, TypeError):
+            raise ValueError(f"Column {column} is not a datetime column")
+
+    values = col.to_numpy(dtype="datetime64[ns]")
+    present = np.flatnonzero(~np.isnat(values))
+    order = present[np.argsort(values[present], kind="stable")]
+    index = pd.DatetimeIndex(values[order], name=column)
+    if isinstance(col.dtype, pd.DatetimeTZDtype):
+        index = index.tz_localize("UTC").tz_convert(col.dtype.tz)
+
+    session["indexes"][column] = (index, order)
+    return session["indexes"][column]
+
+
+def _sorted_values(data: pd.DataFrame, time_col: str, columns: list) -> pd.DataFrame:
+    """The given columns in time order, indexed by the sorted timestamps."""
+    index, order = sorted_index(data, time_col)
+    for col in columns:
+        if col not in data.columns:
+            raise ValueError(f"Column not found: {col}")
+    frame = data[columns].take(order)
+    frame.index = index
+    return frame
+
+
+def resample(
+    data: pd.DataFrame,
+    time_col: str,
+    freq: str,
+    columns: Optional[list] = None,
+    agg: str = "mean",
+) -> pd.DataFrame:
+    """Aggregate columns per time period (``freq`` is a pandas offset, e.g. "D", "h", "MS").
+
+    Defaults to every numeric column; ``count`` also works for other columns.
+    """
+    if agg not in AGG_FUNCS:
+        raise ValueError(f"Unsupported aggregation: {agg}")
+    if columns is None:
+        columns = [c for c in data.select_dtypes(include=[np.number]).columns if c != time_col]
+
+    frame = _sorted_values(data, time_col, columns)
+    try:
+        return frame.resample(freq).agg(agg)
+    except ValueError as e:
+        raise ValueError(f"Invalid frequency {freq}: {e}")
+
+
+def rolling(
+    data: pd.DataFrame,
+    time_col: str,
+    column: str,
+    window: Union[str, int],
+    stats: Optional[list] = None,
+) -> pd.DataFrame:
+    """Rolling statistics of a column in time order.
+
+    ``window`` is either a number of rows or a time span such as "7D", in
+    which case each window covers the rows within that span.
+    """
+    stats = stats or ROLLING_STATS
+    for stat in stats:
+        if stat not in AGG_FUNCS:
+            raise ValueError(f"Unsupported statistic: {stat}")
+
+    series = _sorted_values(data, time_col, [column])[column]
+    if not pd.api.types.is_numeric_dtype(series):
+        raise ValueError(f"Column {column} is not numeric")
+    try:
+        return series.rolling(window).agg(stats)
+    except ValueError as e:
+        raise ValueError(f"Invalid window {window}: {e}")
+
+
+def find_gaps(
+    data: pd.DataFrame,
+    time_col: str,
+    min_gap: Optional[str] = None,
+) -> dict:
+    """Find intervals between consecutive timestamps that are unusually long.
+
+    The expected interval is the median step between distinct timestamps. A
+    gap is a step longer than ``min_gap`` (a time span such as "1h"), or
+    longer than GAP_FACTOR times the expected interval when it is None.
+    """
+    index, _ = sorted_index(data, time_col)
+    stamps = index.asi8
+    steps = np.diff(stamps)
+
+    result = {
+        "column": time_col,
+        "rows": len(stamps),
+        "start": str(index[0]) if len(index) else None,
+        "end": str(index[-1]) if len(index) else None,
+        "duplicate_timestamps": int((steps == 0).sum()),
+        "expected_interval": None,
+        "gaps": [],
+    }
+    distinct = steps[steps > 0]
+    if len(distinct) == 0:
+        return result
+
+    expected = int(np.median(distinct))
+    threshold = (
+        pd.Timedelta(min_gap).value if min_gap is not None else GAP_FACTOR * expected
+    )
+    result["expected_interval"] = str(pd.Timedelta(expected))
+
+    for i in np.flatnonzero(steps > threshold):
+        result["gaps"].append(
+            {
+                "start": str(index[i]),
+                "end": str(index[i + 1]),
+                "duration": str(pd.Timedelta(int(steps[i]))),
+            }
+        )
+    return result
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int = LTTB_POINTS) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of ``n_out - 2`` equal
+    buckets in between, the point forming the largest triangle with the
+    point kept from the previous bucket and the mean of the next bucket.
+    This preserves peaks and troughs far better than taking every n-th point.
+
+    Returns:
+        Indexes of the selected points (``x`` must be sorted)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Means of every bucket, used as the third triangle corner
+    sums_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    mean_x = np.append(sums_x / sizes, x[-1])
+    mean_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        start, stop = edges[b], edges[b + 1]
+        bx, by = x[start:stop], y[start:stop]
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        area = np.abs(
+            (x[prev] - mean_x[b + 1]) * (by - y[prev])
+            - (x[prev] - bx) * (mean_y[b + 1] - y[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[b + 1] = prev
+    return selected
@@ -1,24 +1,67 @@
 import pandas as pd
+import matplotlib
+
+# Plots are only ever written to files, so use the non-interactive backend
+matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 from typing import Optional
 import numpy as np
+from src import correlation, timeseries
+
+
+DENSITY_THRESHOLD = 100_000
+DENSITY_GRID = 300
+HEATMAP_MAX_COLUMNS = 30
+HEATMAP_ANNOTATE_COLUMNS = 15
 
 
 class DataVisualizer:
     """Generate visualizations from data."""
 
-    def __init__(self, data: pd.DataFrame, output_dir: str = "outputs"):
+    def __init__(
+        self, data: pd.DataFrame, output_dir: str = "outputs", reuse_figures: bool = False
+    ):
         self.data = data
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.reuse_figures = reuse_figures
+        self._figures = {}
 
         sns.set_style("whitegrid")
         plt.rcParams["figure.figsize"] = (10, 6)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_figures"] = {}
+        return state
+
+    def _subplots(self, figsize: Optional[tuple] = None):
+        """Return a (fig, ax) pair, reusing a cleared figure when enabled."""
+        if not self.reuse_figures:
+            return plt.subplots(figsize=figsize)
+
+        key = figsize or tuple(plt.rcParams["figure.figsize"])
+        fig = self._figures.get(key)
+        if fig is None:
+            fig = plt.figure(figsize=key)
+            self._figures[key] = fig
+        fig.clf()
+        return fig, fig.add_subplot()
+
+    def _save(self, fig, path: Path) -> None:
+        fig.savefig(path, dpi=150, bbox_inches="tight")
+        if not self.reuse_figures:
+            plt.close(fig)
+
     def histogram(self, column: str, bins: int = 30) -> str:
-        """Create histogram for a numeric column."""
+        """Create histogram for a numeric column.
+
+        Bin counts are computed with NumPy and drawn as bars, so matplotlib
+        never receives the raw values.
+        """
         if column not in self.data.columns:
             raise ValueError(f"Column not found: {column}")
 
@@ -26,15 +69,17 @@ class DataVisualizer:
         if not pd.api.types.is_numeric_dtype(col):
             raise ValueError(f"Column {column} is not numeric")
 
-        fig, ax = plt.subplots()
-        ax.hist(col.dropna(), bins=bins, edgecolor="black", alpha=0.7)
+        values = col.dropna().to_numpy(dtype=np.float64)
+        counts, edges = np.histogram(values, bins=bins)
+
+        fig, ax = self._subplots()
+        ax.stairs(counts, edges, fill=True, edgecolor="black", alpha=0.7)
         ax.set_xlabel(column)
         ax.set_ylabel("Frequency")
         ax.set_title(f"Distribution of {column}")
 
         path = self.output_dir / f"histogram_{column}.png"
-        plt.savefig(path, dpi=150, bbox_inches="tight")
-        plt.close()
+        self._save(fig, path)
 
         return str(path)
 
@@ -45,7 +90,7 @@ class DataVisualizer:
 
         counts = self.data[column].value_counts().head(top_n)
 
-        fig, ax = plt.subplots()
+        fig, ax = self._subplots()
         counts.plot(kind="bar", ax=ax, color="steelblue", edgecolor="black")
         ax.set_xlabel(column)
         ax.set_ylabel("Count")
@@ -53,60 +98,175 @@ class DataVisualizer:
         ax.tick_params(axis="x", rotation=45)
 
         path = self.output_dir / f"bar_{column}.png"
-        plt.savefig(path, dpi=150, bbox_inches="tight")
-        plt.close()
+        self._save(fig, path)
 
         return str(path)
 
-    def correlation_heatmap(self) -> Optional[str]:
-        """Create correlation heatmap for numeric columns."""
-        numeric_cols = self.data.select_dtypes(include=[np.number]).columns
+    def correlation_heatmap(
+        self, method: str = "pearson", max_columns: int = HEATMAP_MAX_COLUMNS
+    ) -> Optional[str]:
+        """Create correlation heatmap for numeric columns.
+
+        With more than ``max_columns`` numeric columns, only the most strongly
+        correlated ones are shown, ordered so that correlated columns are
+        next to each other.
+        """
+        numeric_cols = correlation.numeric_columns(self.data)
         if len(numeric_cols) < 2:
             return None
 
-        corr = self.data[numeric_cols].corr()
+        if len(numeric_cols) > max_columns:
+            columns = correlation.clustered_columns(self.data, max_columns, method)
+            corr = correlation.block_matrix(self.data, columns, method)
+            title = f"Correlation Matrix (top {len(columns)} of {len(numeric_cols)} columns)"
+        else:
+            corr = correlation.correlation_matrix(self.data, method)
+            title = "Correlation Matrix"
 
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig, ax = self._subplots(figsize=(10, 8))
         sns.heatmap(
-            corr, annot=True, fmt=".2f", cmap="coolwarm", center=0, ax=ax, square=True
+            corr,
+            annot=len(corr) <= HEATMAP_ANNOTATE_COLUMNS,
+            fmt=".2f",
+            cmap="coolwarm",
+            center=0,
+            ax=ax,
+            square=True,
         )
-        ax.set_title("Correlation Matrix")
+        ax.set_title(title)
 
         path = self.output_dir / "correlation_heatmap.png"
-        plt.savefig(path, dpi=150, bbox_inches="tight")
-        plt.close()
+        self._save(fig, path)
 
         return str(path)
 
-    def scatter_plot(self, x: str, y: str) -> str:
-        """Create scatter plot for two numeric columns."""
+    def scatter_plot(self, x: str, y: str, density: Optional[bool] = None) -> str:
+        """Create scatter plot for two numeric columns.
+
+        Args:
+            x: X column
+            y: Y column
+            density: Render a 2D density grid instead of individual points.
+                Defaults to True above DENSITY_THRESHOLD rows.
+        """
         if x not in self.data.columns or y not in self.data.columns:
             raise ValueError(f"Column not found")
 
-        fig, ax = plt.subplots()
-        ax.scatter(self.data[x], self.data[y], alpha=0.5)
+        if density is None:
+            density = len(self.data) > DENSITY_THRESHOLD
+
+        fig, ax = self._subplots()
+        if density:
+            self._density_image(ax, x, y)
+        else:
+            ax.scatter(self.data[x], self.data[y], alpha=0.5)
         ax.set_xlabel(x)
         ax.set_ylabel(y)
         ax.set_title(f"{y} vs {x}")
 
         path = self.output_dir / f"scatter_{x}_vs_{y}.png"
-        plt.savefig(path, dpi=150, bbox_inches="tight")
-        plt.close()
+        self._save(fig, path)
+
+        return str(path)
+
+    def _density_image(self, ax, x: str, y: str, grid: int = DENSITY_GRID) -> None:
+        """Bin points into a 2D count grid and draw it as an image."""
+        pair = self.data[[x, y]].dropna()
+        xs = pair[x].to_numpy(dtype=np.float64)
+        ys = pair[y].to_numpy(dtype=np.float64)
+
+        counts, x_edges, y_edges = np.histogram2d(xs, ys, bins=grid)
+        # Log scaling keeps sparse regions visible next to dense ones
+        image = np.log1p(counts.T)
+        image[counts.T == 0] = np.nan
+
+        im = ax.imshow(
+            image,
+            origin="lower",
+            aspect="auto",
+            extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]),
+            cmap="viridis",
+            interpolation="nearest",
+        )
+        fig = ax.get_figure()
+        fig.colorbar(im, ax=ax, label="log(1 + count)")
+
+    def timeseries_plot(
+        self,
+        column: str,
+        time_column: Optional[str] = None,
+        max_points: int = timeseries.LTTB_POINTS,
+    ) -> str:
+        """Create line plot of a numeric column over time.
+
+        Rows are drawn in time order and long series are downsampled with
+        LTTB to ``max_points`` points, which keeps their visual shape.
+        """
+        if column not in self.data.columns:
+            raise ValueError(f"Column not found: {column}")
+        if not pd.api.types.is_numeric_dtype(self.data[column]):
+            raise ValueError(f"Column {column} is not numeric")
+
+        time_column = timeseries.time_column(self.data, time_column)
+        index, order = timeseries.sorted_index(self.data, time_column)
+        values = self.data[column].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        present = ~np.isnan(values)
+        stamps, values = index[present], values[present]
+
+        keep = timeseries.lttb(stamps.asi8.astype(np.float64), values, max_points)
+
+        fig, ax = self._subplots()
+        ax.plot(stamps[keep], values[keep], linewidth=1)
+        ax.set_xlabel(time_column)
+        ax.set_ylabel(column)
+        title = f"{column} over time"
+        if len(keep) < len(values):
+            title += f" ({len(keep):,} of {len(values):,} points)"
+        ax.set_title(title)
+        fig.autofmt_xdate()
+
+        path = self.output_dir / f"timeseries_{column}.png"
+        self._save(fig, path)
 
         return str(path)
 
     def box_plot(self, column: str) -> str:
-        """Create box plot for numeric column."""
+        """Create box plot for numeric column.
+
+        Quartiles and whiskers are computed once with NumPy and drawn with
+        ``ax.bxp``; only outliers beyond the whiskers are plotted as points
+        (sampled when there are many of them).
+        """
         if column not in self.data.columns:
             raise ValueError(f"Column not found: {column}")
 
-        fig, ax = plt.subplots()
-        self.data[column].dropna().plot(kind="box", ax=ax)
+        values = self.data[column].dropna().to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            raise ValueError(f"Column {column} has no values")
+
+        q1, med, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        fliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+        if len(fliers) > 1000:
+            fliers = np.random.default_rng(0).choice(fliers, 1000, replace=False)
+
+        stats = {
+            "med": med,
+            "q1": q1,
+            "q3": q3,
+            "whislo": inside.min(),
+            "whishi": inside.max(),
+            "fliers": fliers,
+            "label": column,
+        }
+
+        fig, ax = self._subplots()
+        ax.bxp([stats])
         ax.set_ylabel(column)
         ax.set_title(f"Box Plot of {column}")
 
         path = self.output_dir / f"boxplot_{column}.png"
-        plt.savefig(path, dpi=150, bbox_inches="tight")
-        plt.close()
+        self._save(fig, path)
 
         return str(path)
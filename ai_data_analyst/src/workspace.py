@@ -0,0 +1,190 @@
+import re
+import json
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+from src.loader import DataLoader, _sql_string
+from src.context import SchemaDigest
+
+
+WORKSPACE_DIR = ".ai_data_analyst_workspace"
+MANIFEST_FILE = "workspace.json"
+JOIN_TYPES = {"inner", "left", "right", "outer"}
+
+
+class Workspace:
+    """Named datasets stored as Parquet files and loaded only when needed.
+
+    Joins and concatenations run in DuckDB directly over the Parquet files
+    and are written back as new named datasets, so neither the inputs nor
+    the result have to be held in memory.
+    """
+
+    def __init__(self, root: str = WORKSPACE_DIR):
+        self.root = Path(root)
+        self.manifest_path = self.root / MANIFEST_FILE
+        self.manifest = (
+            json.loads(self.manifest_path.read_text())
+            if self.manifest_path.exists()
+            else {}
+        )
+
+    def _save_manifest(self) -> None:
+        self.root.mkdir(exist_ok=True)
+        self.manifest_path.write_text(json.dumps(self.manifest, indent=2))
+
+    def _path(self, name: str) -> Path:
+        return self.root / f"{name}.parquet"
+
+    @staticmethod
+    def _check_name(name: str) -> None:
+        # Names are used as SQL table names
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+            raise ValueError(
+                f"Invalid dataset name: {name} (use letters, digits and underscores)"
+            )
+
+    def _require(self, name: str) -> None:
+        if name not in self.manifest:
+            raise ValueError(f"Dataset not found: {name}")
+
+    def names(self) -> list:
+        return list(self.manifest)
+
+    def add(self, name: str, file_path: str, optimize: bool = False) -> dict:
+        """Load a data file and store it in the workspace as ``name``."""
+        self._check_name(name)
+        loader = DataLoader()
+        data = loader.load(file_path, optimize=optimize)
+        return self._store(name, data, {"file": str(Path(file_path).resolve())})
+
+    def add_frame(self, name: str, data: pd.DataFrame, source: Optional[dict] = None) -> dict:
+        """Store an in-memory DataFrame in the workspace as ``name``."""
+        self._check_name(name)
+        return self._store(name, data, source or {})
+
+    def _store(self, name: str, data: pd.DataFrame, source: dict) -> dict:
+        self.root.mkdir(exist_ok=True)
+        try:
+            data.to_parquet(self._path(name), index=False)
+        except Exception as e:
+            raise ValueError(f"Could not store {name} as Parquet: {e}")
+
+        self.manifest[name] = {
+            "rows": len(data),
+            "columns": [str(c) for c in data.columns],
+            "source": source,
+            "digest": SchemaDigest.from_data(data).to_dict(),
+        }
+        self._save_manifest()
+        return self.manifest[name]
+
+    def get(self, name: str, columns: Optional[list] = None) -> pd.DataFrame:
+        """Read a dataset (optionally only some columns) into a DataFrame."""
+        self._require(name)
+        return pd.read_parquet(self._path(name), columns=columns)
+
+    def drop(self, name: str) -> None:
+        self._require(name)
+        self._path(name).unlink(missing_ok=True)
+        del self.manifest[name]
+        self._save_manifest()
+
+    def connect(self):
+        """Open a DuckDB connection with every dataset registered as a view."""
+        import duckdb
+
+        con = duckdb.connect()
+        for name in self.manifest:
+            con.execute(
+                f'CREATE VIEW "{name}" AS '
+                f"SELECT * FROM read_parquet({_sql_string(self._path(name))})"
+            )
+        return con
+
+    def sql(self, query: str) -> pd.DataFrame:
+        """Run a SQL query over the workspace datasets (one table per name)."""
+        con = self.connect()
+        try:
+            return con.execute(query).df()
+        finally:
+            con.close()
+
+    def _versions(self, names: list) -> list:
+        """File modification times of the inputs, to invalidate cached results."""
+        return [self._path(n).stat().st_mtime_ns for n in names]
+
+    def _materialize(self, name: str, select: str, source: dict, force: bool) -> dict:
+        """Write the result of a SELECT to ``name``, reusing a cached result."""
+        self._check_name(name)
+        cached = self.manifest.get(name)
+        if not force and cached and cached["source"] == source and self._path(name).exists():
+            return cached
+
+        con = self.connect()
+        try:
+            tmp = self.root / f".{name}.parquet.tmp"
+            con.execute(f"COPY ({select}) TO {_sql_string(tmp)} (FORMAT PARQUET)")
+            tmp.replace(self._path(name))
+            rows = con.execute(
+                f"SELECT count(*) FROM read_parquet({_sql_string(self._path(name))})"
+            ).fetchone()[0]
+            columns = [
+                row[0]
+                for row in con.execute(
+                    f"DESCRIBE SELECT * FROM read_parquet({_sql_string(self._path(name))})"
+                ).fetchall()
+            ]
+        finally:
+            con.close()
+
+        # The digest is computed lazily by digest(), when it is first needed
+        self.manifest[name] = {"rows": rows, "columns": columns, "source": source}
+        self._save_manifest()
+        return self.manifest[name]
+
+    def join(
+        self,
+        left: str,
+        right: str,
+        on: list,
+        name: str,
+        how: str = "inner",
+        force: bool = False,
+    ) -> dict:
+        """Join two datasets on key columns and store the result as ``name``."""
+        self._require(left)
+        self._require(right)
+        if how not in JOIN_TYPES:
+            raise ValueError(f"Unsupported join type: {how}")
+        for col in on:
+            if col not in self.manifest[left]["columns"] or col not in self.manifest[right]["columns"]:
+                raise ValueError(f"Join column not found in both datasets: {col}")
+
+        keys = ", ".join(f'"{col}"' for col in on)
+        how_sql = "FULL OUTER" if how == "outer" else how.upper()
+        select = f'SELECT * FROM "{left}" {how_sql} JOIN "{right}" USING ({keys})'
+        source = {
+            "join": [left, right],
+            "on": list(on),
+            "how": how,
+            "versions": self._versions([left, right]),
+        }
+        return self._materialize(name, select, source, force)
+
+    def concat(self, names: list, name: str, force: bool = False) -> dict:
+        """Stack datasets by column name and store the result as ``name``."""
+        for n in names:
+            self._require(n)
+        select = " UNION ALL BY NAME ".join(f'SELECT * FROM "{n}"' for n in names)
+        source = {"concat": list(names), "versions": self._versions(names)}
+        return self._materialize(name, select, source, force)
+
+    def digest(self, name: str) -> SchemaDigest:
+        """Return the stored schema digest of a dataset, computing it if needed."""
+        self._require(name)
+        entry = self.manifest[name]
+        if "digest" not in entry:
+            entry["digest"] = SchemaDigest.from_data(self.get(name)).to_dict()
+            self._save_manifest()
+        return SchemaDigest.from_dict(entry["digest"])
@@ -0,0 +1,55 @@
+"""Offline tests of DataLoader's Excel reading.
+
+Run with ``python test_loader.py`` or ``pytest test_loader.py``.
+"""
+import tempfile
+from pathlib import Path
+from openpyxl import Workbook
+from src.loader import DataLoader, header_names
+
+
+def write_workbook(path: Path, rows: list) -> None:
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    workbook.save(path)
+
+
+def test_header_names_are_made_unique():
+    assert header_names(("id", "when", None, "id", "", "id")) == [
+        "id", "when", "Unnamed: 2", "id.1", "Unnamed: 4", "id.2",
+    ]
+
+
+def test_duplicate_and_blank_headers_load():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "dupes.xlsx"
+        write_workbook(path, [["id", "when", None, "id"], [1, "a", 2.5, 10], [2, "b", 3.5, 20]])
+
+        data = DataLoader(Path(tmp) / "cache").load(str(path))
+        assert list(data.columns) == ["id", "when", "Unnamed: 2", "id.1"]
+        assert data["id.1"].tolist() == [10, 20]
+
+
+def test_duplicate_header_can_be_selected():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "dupes.xlsx"
+        write_workbook(path, [["id", "id", "value"], [1, 2, 3]])
+
+        data = DataLoader(Path(tmp) / "cache").load(str(path), columns=["id.1", "value"])
+        assert list(data.columns) == ["id.1", "value"]
+        assert data.iloc[0].tolist() == [2, 3]
+
+
+def main():
+    for test in (
+        test_header_names_are_made_unique,
+        test_duplicate_and_blank_headers_load,
+        test_duplicate_header_can_be_selected,
+    ):
+        test()
+        print(f"{test.__name__}: ok")
+
+
+if __name__ == "__main__":
+    main()